@@ -0,0 +1,39 @@
+"""API URLs with async read endpoints, used when ASYNC_READS is on.
+
+Async routes come first and keep the router's names; requests they do
+not serve fall back to the sync views of the same names.
+"""
+from django.urls import path
+
+from api.async_views import (
+    async_read,
+    ingredient_list,
+    recipe_detail,
+    recipe_list,
+    subscription_list,
+    tag_detail,
+    tag_list
+)
+from api.urls import router
+from api.urls import urlpatterns as sync_urlpatterns
+
+app_name = 'api'
+
+sync_views = {url.name: url.callback for url in router.urls}
+
+
+def async_path(route, handler, name):
+    return path(route, async_read(handler, sync_views[name]), name=name)
+
+
+urlpatterns = [
+    async_path('recipes/', recipe_list, 'recipes-list'),
+    async_path('recipes/<int:pk>/', recipe_detail, 'recipes-detail'),
+    async_path('tags/', tag_list, 'tags-list'),
+    async_path('tags/<int:pk>/', tag_detail, 'tags-detail'),
+    async_path('ingredients/', ingredient_list, 'ingredients-list'),
+    async_path(
+        'users/subscriptions/', subscription_list, 'users-subscriptions'
+    ),
+    *sync_urlpatterns,
+]
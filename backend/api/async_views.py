@@ -0,0 +1,233 @@
+"""Async read endpoints served when the API runs under ASGI.
+
+DRF views are sync only, so these are plain Django views setting up the
+viewset the way APIView.dispatch() does and reading through the async
+ORM. API errors are rendered by the viewset's handle_exception(). Other
+methods, the browsable API and keyset pages are handed to the sync
+viewset, which answers them as before.
+"""
+from django.contrib.auth.models import AnonymousUser
+
+from rest_framework.authentication import (
+    TokenAuthentication,
+    get_authorization_header
+)
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import (
+    APIException,
+    AuthenticationFailed,
+    NotFound
+)
+from rest_framework.response import Response
+
+from asgiref.sync import sync_to_async
+
+from api.catalog import aget_snapshot, snapshot_response
+from api.conditional import (
+    add_etag,
+    adetail_etag,
+    aetag_versions,
+    list_etag,
+    not_modified,
+    row_etag
+)
+from api.membership import aget_request_membership
+from api.read_serializers import (
+    alist,
+    arecipes_data,
+    asubscriptions_data,
+    recipe_values,
+    subscription_values
+)
+from api.renderers import ORJSONRenderer
+from api.response_cache import acached_response, aresponse_key, cache_response
+from recipes.autocomplete import ingredient_index
+from recipes.counts import aget_list_stats
+from recipes.models import Ingredient, Tag
+from recipes.registry import TAG_FIELDS
+from recipes.versions import INGREDIENTS, TAGS
+from users.models import User
+
+INGREDIENT_FIELDS = ('id', 'name', 'measurement_unit')
+
+
+class DeclinedError(Exception):
+    """The request is left to the sync viewset."""
+
+
+async def authenticate(request):
+    """TokenAuthentication with the async ORM, returns (user, token).
+
+    Headers TokenAuthentication would reject are passed to it, so it
+    raises the same AuthenticationFailed as in sync views.
+    """
+    auth = get_authorization_header(request).split()
+    if not auth or auth[0].lower() != b'token':
+        return AnonymousUser(), None
+    reject = sync_to_async(TokenAuthentication().authenticate)
+    if len(auth) != 2:
+        return await reject(request)
+    try:
+        key = auth[1].decode()
+    except UnicodeError:
+        return await reject(request)
+    token = await Token.objects.select_related('user').filter(
+        key=key
+    ).afirst()
+    if token is None or not token.user.is_active:
+        return await reject(request)
+    return token.user, token
+
+
+async def initial(view, request, args, kwargs):
+    """APIView.initial() with async authentication."""
+    view.format_kwarg = view.get_format_suffix(**kwargs)
+    neg = view.perform_content_negotiation(request)
+    request.accepted_renderer, request.accepted_media_type = neg
+    if not isinstance(request.accepted_renderer, ORJSONRenderer):
+        raise DeclinedError
+    version, scheme = view.determine_version(request, *args, **kwargs)
+    request.version, request.versioning_scheme = version, scheme
+    try:
+        request.user, request.auth = await authenticate(request)
+    except AuthenticationFailed:
+        request.user, request.auth = AnonymousUser(), None
+        raise
+    view.check_permissions(request)
+    view.check_throttles(request)
+
+
+async def dispatch(handler, sync_view, request, args, kwargs):
+    view = sync_view.cls(**sync_view.initkwargs)
+    view.action_map = sync_view.actions
+    for method, action in view.action_map.items():
+        setattr(view, method, getattr(view, action))
+    view.args, view.kwargs = args, kwargs
+    request = view.initialize_request(request, *args, **kwargs)
+    view.request = request
+    view.headers = view.default_response_headers
+    try:
+        await initial(view, request, args, kwargs)
+        response = await handler(view, request, *args, **kwargs)
+    except APIException as exc:
+        response = view.handle_exception(exc)
+    return view.finalize_response(request, response, *args, **kwargs)
+
+
+def async_read(handler, sync_view):
+    """Serve GET requests with handler, anything else with sync_view.
+
+    handler(view, request, *args, **kwargs) returns a response, raises an
+    APIException to answer with an error or DeclinedError to fall back to
+    sync_view.
+    """
+    run_sync_view = sync_to_async(sync_view)
+
+    async def view(request, *args, **kwargs):
+        if request.method == 'GET':
+            try:
+                return await dispatch(
+                    handler, sync_view, request, args, kwargs
+                )
+            except DeclinedError:
+                pass
+        return await run_sync_view(request, *args, **kwargs)
+
+    view.csrf_exempt = True
+    return view
+
+
+def check_page_number_mode(view, request):
+    if view.paginator.is_keyset(request):
+        raise DeclinedError
+
+
+async def filtered_queryset(view):
+    """view.filter_queryset(), its filters may validate against the DB."""
+    return await sync_to_async(view.filter_queryset)(view.get_queryset())
+
+
+async def recipe_list(view, request):
+    check_page_number_mode(view, request)
+    key = await aresponse_key(request)
+    response = await acached_response(request, key)
+    if response:
+        return response
+    recipes = await filtered_queryset(view)
+    await aget_request_membership(request)
+    view.stats = await aget_list_stats(recipes, view.get_count_key())
+    etag = list_etag(request, view.stats, await aetag_versions())
+    response = not_modified(request, etag)
+    if response:
+        return response
+    rows = await view.paginator.apaginate_queryset(
+        recipe_values(recipes.for_read(request.user)),
+        request,
+        view.get_count(recipes)
+    )
+    return cache_response(
+        add_etag(
+            view.get_paginated_response(await arecipes_data(rows, request)),
+            etag
+        ),
+        key,
+        etag
+    )
+
+
+async def recipe_detail(view, request, pk):
+    key = await aresponse_key(request)
+    response = await acached_response(request, key)
+    if response:
+        return response
+    versions = await aetag_versions()
+    if 'HTTP_IF_NONE_MATCH' in request.META:
+        response = not_modified(
+            request, await adetail_etag(request, pk, versions)
+        )
+        if response:
+            return response
+    queryset = await filtered_queryset(view)
+    row = await recipe_values(queryset).filter(pk=pk).afirst()
+    if row is None:
+        raise NotFound
+    view.check_object_permissions(request, row)
+    etag = row_etag(row, versions)
+    data = await arecipes_data([row], request)
+    return cache_response(add_etag(Response(data[0]), etag), key, etag)
+
+
+async def tag_list(view, request):
+    return snapshot_response(request, await aget_snapshot(
+        TAGS, lambda: alist(Tag.objects.values(*TAG_FIELDS))
+    ))
+
+
+async def tag_detail(view, request, pk):
+    row = await Tag.objects.filter(pk=pk).values(*TAG_FIELDS).afirst()
+    if row is None:
+        raise NotFound
+    return Response(row)
+
+
+async def ingredient_list(view, request):
+    query = request.query_params.get('name')
+    if query is None:
+        return snapshot_response(request, await aget_snapshot(
+            INGREDIENTS,
+            lambda: alist(Ingredient.objects.values(*INGREDIENT_FIELDS))
+        ))
+    return Response(await ingredient_index.asearch(query))
+
+
+async def subscription_list(view, request):
+    check_page_number_mode(view, request)
+    queryset = subscription_values(
+        User.objects.filter(subscriber_author__user=request.user)
+    )
+    rows = await view.paginator.apaginate_queryset(
+        queryset, request, (await queryset.acount(), False)
+    )
+    return view.get_paginated_response(
+        await asubscriptions_data(rows, view.get_recipes_limit())
+    )
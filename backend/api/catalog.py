@@ -0,0 +1,70 @@
+"""Pre-rendered snapshots of the ingredient and tag catalogs."""
+import hashlib
+import threading
+from collections import namedtuple
+
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+from api.renderers import ORJSONRenderer
+from recipes.versions import aget_version, get_version
+
+CACHE_MAX_AGE = 60 * 60 * 24
+
+Snapshot = namedtuple('Snapshot', ['version', 'body', 'etag'])
+
+_snapshots = {}
+_lock = threading.Lock()
+
+
+def make_snapshot(version, data):
+    body = ORJSONRenderer().render(data)
+    return Snapshot(version, body, f'"{hashlib.sha1(body).hexdigest()}"')
+
+
+def cached_snapshot(name, version):
+    """Return the stored snapshot of name if it is of version."""
+    snapshot = _snapshots.get(name)
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+    return None
+
+
+def store_snapshot(name, version, data):
+    snapshot = make_snapshot(version, data)
+    _snapshots[name] = snapshot
+    return snapshot
+
+
+def get_snapshot(name, render):
+    """Return rendered catalog, calling render() once per data version."""
+    version = get_version(name)
+    snapshot = cached_snapshot(name, version)
+    if snapshot is not None:
+        return snapshot
+    with _lock:
+        return cached_snapshot(name, version) or store_snapshot(
+            name, version, render()
+        )
+
+
+async def aget_snapshot(name, load):
+    """get_snapshot() for async views, awaiting load() for the data.
+
+    Concurrent misses may render the same version twice, which is
+    harmless as the snapshots are equal.
+    """
+    version = await aget_version(name)
+    return cached_snapshot(name, version) or store_snapshot(
+        name, version, await load()
+    )
+
+
+def snapshot_response(request, snapshot):
+    """Serve a catalog snapshot with a strong ETag, answering 304."""
+    response = HttpResponse(snapshot.body, content_type='application/json')
+    response['ETag'] = snapshot.etag
+    patch_cache_control(response, public=True, max_age=CACHE_MAX_AGE)
+    return get_conditional_response(
+        request, etag=snapshot.etag, response=response
+    )
@@ -0,0 +1,116 @@
+"""Conditional GET support for recipe endpoints."""
+import hashlib
+
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+
+from api.membership import get_request_membership
+from recipes.models import Recipe
+from recipes.versions import (
+    AUTHORS,
+    INGREDIENTS,
+    RECIPE_COUNTS,
+    TAGS,
+    aget_versions,
+    get_versions
+)
+
+FLAG_FIELDS = ('is_favorited', 'is_in_shopping_cart', 'author_is_subscribed')
+# Catalogs embedded in recipe representations.
+EMBEDDED_CATALOGS = (TAGS, INGREDIENTS, AUTHORS)
+ETAG_VERSIONS = (*EMBEDDED_CATALOGS, RECIPE_COUNTS)
+
+
+def make_etag(*parts):
+    """Weak ETag over the parts that make up a representation."""
+    digest = hashlib.sha1('|'.join(map(str, parts)).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_versions():
+    """Catalog versions recipe ETags are made of, read in one call."""
+    return get_versions(*ETAG_VERSIONS)
+
+
+async def aetag_versions():
+    """etag_versions() for async views."""
+    return await aget_versions(*ETAG_VERSIONS)
+
+
+def recipe_etag(versions, recipe_id, updated_at, *flags):
+    return make_etag(
+        recipe_id,
+        updated_at.isoformat(),
+        *flags,
+        *(versions[name] for name in EMBEDDED_CATALOGS)
+    )
+
+
+def row_etag(row, versions):
+    """ETag of a recipe row read through recipe_values()."""
+    return recipe_etag(
+        versions,
+        row['id'],
+        row['updated_at'],
+        *(row[field] for field in FLAG_FIELDS)
+    )
+
+
+def page_etag(rows, *parts):
+    """ETag of a keyset page made up from its rows alone."""
+    versions = etag_versions()
+    return make_etag(*(row_etag(row, versions) for row in rows), *parts)
+
+
+def etag_fields(request, pk):
+    return Recipe.objects.with_user_flags(request.user).filter(
+        pk=pk
+    ).values_list('pk', 'updated_at', *FLAG_FIELDS)
+
+
+def detail_etag(request, pk):
+    """ETag of a recipe read with one light query, None if missing."""
+    row = etag_fields(request, pk).first()
+    return recipe_etag(etag_versions(), *row) if row else None
+
+
+async def adetail_etag(request, pk, versions):
+    """detail_etag() for async views, versions from aetag_versions()."""
+    row = await etag_fields(request, pk).afirst()
+    return recipe_etag(versions, *row) if row else None
+
+
+def list_etag(request, stats, versions):
+    """ETag of a filtered recipe list from its ListStats.
+
+    Newest updated_at catches edits and additions, the row count catches
+    deletions and the viewer's membership digest catches flag changes.
+    Embedded tags, ingredients and authors change with their versions.
+    A planner estimate may stay put on deletions, so it is replaced with
+    the version bumped by every recipe save and delete.
+    """
+    membership = get_request_membership(request)
+    return make_etag(
+        stats.last_modified and stats.last_modified.isoformat(),
+        versions[RECIPE_COUNTS] if stats.approximate else stats.count,
+        membership.digest() if membership else 'anonymous',
+        *(versions[name] for name in EMBEDDED_CATALOGS)
+    )
+
+
+def not_modified(request, etag):
+    """Return 304 response if the client already has etag."""
+    if etag is None or request.method not in ('GET', 'HEAD'):
+        return None
+    known = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+    weak = etag.removeprefix('W/')
+    if '*' in known or weak in (tag.removeprefix('W/') for tag in known):
+        return add_etag(HttpResponseNotModified(), etag)
+    return None
+
+
+def add_etag(response, etag):
+    response['ETag'] = etag
+    patch_vary_headers(response, ['Authorization'])
+    return response
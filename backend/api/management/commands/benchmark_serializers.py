@@ -0,0 +1,148 @@
+import json
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Exists, OuterRef, Value
+from django.test import RequestFactory
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from api.read_serializers import (
+    recipe_values,
+    recipes_data,
+    subscription_values,
+    subscriptions_data,
+    user_values,
+    users_data
+)
+from api.serializers import (
+    RecipeSerializer,
+    SubscriptionListSerializer,
+    UserCustomSerializer
+)
+from recipes.models import Recipe
+from users.models import SubscribeUser, User
+
+
+def users_queryset(user):
+    if not user.is_authenticated:
+        return User.objects.annotate(is_subscribed=Value(False))
+    return User.objects.annotate(
+        is_subscribed=Exists(
+            SubscribeUser.objects.filter(user=user, author=OuterRef('pk'))
+        )
+    )
+
+
+def recipes_case(request, limit):
+    queryset = Recipe.objects.for_read(request.user)[:limit]
+    return (
+        lambda: RecipeSerializer(
+            queryset.all(), many=True, context={'request': request}
+        ).data,
+        lambda: recipes_data(recipe_values(queryset.all()), request)
+    )
+
+
+def users_case(request, limit):
+    queryset = users_queryset(request.user)[:limit]
+    return (
+        lambda: UserCustomSerializer(
+            queryset.all(), many=True, context={'request': request}
+        ).data,
+        lambda: users_data(user_values(queryset.all()))
+    )
+
+
+def subscriptions_case(request, limit):
+    authors = User.objects.filter(subscriber_author__user=request.user)
+    return (
+        lambda: SubscriptionListSerializer(
+            authors.prefetch_related('recipes')[:limit],
+            many=True,
+            context={'request': request, 'recipes_limit': 3}
+        ).data,
+        lambda: subscriptions_data(subscription_values(authors)[:limit], 3)
+    )
+
+
+CASES = {
+    'recipes': recipes_case,
+    'users': users_case,
+    'subscriptions': subscriptions_case,
+}
+
+
+class Command(BaseCommand):
+
+    help = (
+        'Compare read serializers with ModelSerializer ones: time to load '
+        'and render a page of JSON, per object'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--case',
+            action='append',
+            choices=sorted(CASES),
+            dest='cases',
+            help='payload to measure, may be repeated, all by default'
+        )
+        parser.add_argument(
+            '--limit', type=int, default=16, help='objects per page'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=50, help='pages rendered per path'
+        )
+        parser.add_argument(
+            '--user',
+            type=int,
+            help='id of the viewing user, required for subscriptions'
+        )
+        parser.add_argument(
+            '--host',
+            default=settings.ALLOWED_HOSTS[0],
+            help='host of absolute URLs, one of ALLOWED_HOSTS'
+        )
+
+    def get_request(self, user_id, host):
+        request = Request(RequestFactory().get('/', HTTP_HOST=host))
+        if user_id is None:
+            request.user = AnonymousUser()
+        else:
+            try:
+                request.user = User.objects.get(pk=user_id)
+            except User.DoesNotExist:
+                raise CommandError(f'User {user_id} does not exist')
+        return request
+
+    def measure(self, render, repeat):
+        """Seconds per page, rendered JSON of the last page."""
+        renderer = JSONRenderer()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            content = renderer.render(render())
+        return (time.perf_counter() - started) / repeat, content
+
+    def handle(self, *args, **kwargs):
+        request = self.get_request(kwargs['user'], kwargs['host'])
+        for name in kwargs['cases'] or CASES:
+            if name == 'subscriptions' and kwargs['user'] is None:
+                self.stderr.write('subscriptions skipped, pass --user')
+                continue
+            reference, fast = CASES[name](request, kwargs['limit'])
+            reference_time, expected = self.measure(
+                reference, kwargs['repeat']
+            )
+            fast_time, content = self.measure(fast, kwargs['repeat'])
+            objects = len(json.loads(content)) or 1
+            self.stdout.write(
+                f'{name}: {objects} objects, '
+                f'serializer {reference_time / objects * 1e6:.0f} us, '
+                f'read path {fast_time / objects * 1e6:.0f} us per object, '
+                f'{reference_time / fast_time:.1f}x'
+                + ('' if content == expected else ', OUTPUT DIFFERS')
+            )
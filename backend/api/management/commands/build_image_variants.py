@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from recipes.images import build_variants
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+
+    help = 'Build thumbnails and WebP variants of recipe images'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='rebuild variants of recipes that already have them'
+        )
+
+    def handle(self, *args, **kwargs):
+        recipes = Recipe.objects.exclude(image='')
+        if not kwargs['all']:
+            recipes = recipes.filter(image_variants={})
+        built = 0
+        for recipe_id, name in recipes.values_list('id', 'image').iterator():
+            try:
+                build_variants(recipe_id, name)
+            except (OSError, ValueError) as error:
+                self.stderr.write(f'recipe {recipe_id}: {error}')
+                continue
+            built += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Built image variants of {built} recipes')
+        )
@@ -0,0 +1,119 @@
+import json
+import tarfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Prefetch
+
+from recipes.models import IngredientRecipe, Recipe, Tag
+
+CHUNK_SIZE = 500
+
+
+def recipe_record(recipe):
+    """Self contained export record, related rows given by natural keys."""
+    return {
+        'id': recipe.pk,
+        'author': {
+            'email': recipe.author.email,
+            'username': recipe.author.username,
+            'first_name': recipe.author.first_name,
+            'last_name': recipe.author.last_name,
+        },
+        'name': recipe.name,
+        'text': recipe.text,
+        'cooking_time': recipe.cooking_time,
+        'image': recipe.image.name,
+        'tags': [
+            {'name': tag.name, 'color': tag.color, 'slug': tag.slug}
+            for tag in recipe.tags.all()
+        ],
+        'ingredients': [
+            {
+                'name': item.ingredient.name,
+                'measurement_unit': item.ingredient.measurement_unit,
+                'amount': item.amount,
+            } for item in recipe.ingredient_recipe.all()
+        ],
+    }
+
+
+def export_queryset(from_id=None, to_id=None):
+    bounds = {}
+    if from_id is not None:
+        bounds['pk__gte'] = from_id
+    if to_id is not None:
+        bounds['pk__lte'] = to_id
+    return Recipe.objects.filter(**bounds).select_related(
+        'author'
+    ).prefetch_related(
+        Prefetch('tags', queryset=Tag.objects.order_by('id')),
+        Prefetch(
+            'ingredient_recipe',
+            queryset=IngredientRecipe.objects.select_related(
+                'ingredient'
+            ).order_by('id')
+        )
+    ).order_by('id')
+
+
+class Command(BaseCommand):
+
+    help = (
+        'Export recipes with their tags and ingredients as NDJSON. '
+        'Disjoint --from-id/--to-id ranges may be exported in parallel.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'output',
+            help='NDJSON file path, - for stdout'
+        )
+        parser.add_argument('--from-id', type=int, help='first recipe id')
+        parser.add_argument('--to-id', type=int, help='last recipe id')
+        parser.add_argument(
+            '--media',
+            help='also pack recipe images into this tar file'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='recipes fetched and prefetched per query'
+        )
+
+    def write_records(self, output, media, kwargs):
+        exported = 0
+        for recipe in export_queryset(
+            kwargs['from_id'], kwargs['to_id']
+        ).iterator(chunk_size=kwargs['chunk_size']):
+            output.write(
+                json.dumps(recipe_record(recipe), ensure_ascii=False) + '\n'
+            )
+            if media is not None and recipe.image:
+                self.pack_image(media, recipe.image)
+            exported += 1
+        return exported
+
+    def pack_image(self, media, image):
+        try:
+            with image.open('rb') as content:
+                info = tarfile.TarInfo(image.name)
+                info.size = image.size
+                media.addfile(info, content)
+        except FileNotFoundError:
+            self.stderr.write(f'Image {image.name} is missing, skipped')
+
+    def handle(self, *args, **kwargs):
+        media = tarfile.open(kwargs['media'], 'w') if kwargs['media'] else None
+        try:
+            if kwargs['output'] == '-':
+                exported = self.write_records(self.stdout, media, kwargs)
+            else:
+                with open(kwargs['output'], 'w', encoding='utf-8') as output:
+                    exported = self.write_records(output, media, kwargs)
+        except OSError as ex:
+            raise CommandError(f'Error while export recipes: {ex}')
+        finally:
+            if media is not None:
+                media.close()
+        self.stderr.write(self.style.SUCCESS(f'Exported {exported} recipes'))
@@ -0,0 +1,251 @@
+import sys
+import tarfile
+from collections import Counter
+from pathlib import PurePosixPath
+
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.management.commands.load_data import batches, ndjson_rows
+from api.management.commands.recompute_counters import count_of
+from recipes import timeline
+from recipes.models import Ingredient, IngredientRecipe, Recipe, Tag
+from recipes.versions import (
+    INGREDIENTS,
+    RECIPE_COUNTS,
+    RECIPES,
+    TAGS,
+    bump_version
+)
+from users.models import SubscribeUser, User
+
+BATCH_SIZE = 500
+
+
+class RecipeImporter:
+    """Insert exported recipe records in batches.
+
+    Authors are matched by email, tags by slug and ingredients by name
+    and measurement unit. Missing tags and ingredients are created,
+    missing authors only when asked to, otherwise their recipes are
+    skipped. A recipe whose author already has one with the same name
+    is skipped too, so an import can be repeated.
+    """
+
+    def __init__(self, media=None, create_authors=False):
+        self.media = media
+        self.create_authors = create_authors
+        self.stats = Counter()
+        self.author_ids = set()
+
+    def resolve_authors(self, records):
+        emails = {record['author']['email'] for record in records}
+        authors = dict(
+            User.objects.filter(email__in=emails).values_list('email', 'id')
+        )
+        missing = {
+            record['author']['email']: record['author']
+            for record in records
+            if record['author']['email'] not in authors
+        }
+        if missing and self.create_authors:
+            users = [User(**author) for author in missing.values()]
+            for user in users:
+                user.set_unusable_password()
+            User.objects.bulk_create(users)
+            self.stats['authors'] += len(users)
+            authors.update(
+                User.objects.filter(email__in=missing).values_list(
+                    'email', 'id'
+                )
+            )
+        return authors
+
+    def resolve_tags(self, records):
+        rows = {
+            tag['slug']: tag for record in records for tag in record['tags']
+        }
+        tags = dict(
+            Tag.objects.filter(slug__in=rows).values_list('slug', 'id')
+        )
+        missing = [Tag(**row) for slug, row in rows.items() if slug not in tags]
+        if missing:
+            Tag.objects.bulk_create(missing)
+            self.stats['tags'] += len(missing)
+            tags.update(
+                Tag.objects.filter(slug__in=rows).values_list('slug', 'id')
+            )
+        return tags
+
+    def ingredient_ids(self, names):
+        ids = {}
+        for name, unit, pk in Ingredient.objects.filter(
+            name__in=names
+        ).order_by('-id').values_list('name', 'measurement_unit', 'id'):
+            ids[name, unit] = pk
+        return ids
+
+    def resolve_ingredients(self, records):
+        keys = {
+            (item['name'], item['measurement_unit'])
+            for record in records for item in record['ingredients']
+        }
+        names = {name for name, _ in keys}
+        ingredients = self.ingredient_ids(names)
+        missing = [
+            Ingredient(name=name, measurement_unit=unit)
+            for name, unit in keys - ingredients.keys()
+        ]
+        if not missing:
+            return ingredients
+        Ingredient.objects.bulk_create(missing)
+        self.stats['ingredients'] += len(missing)
+        return self.ingredient_ids(names)
+
+    def unpack_image(self, name):
+        """Save the image from the media tar, return its stored name."""
+        if self.media is None or not name:
+            return name
+        path = PurePosixPath(name)
+        if path.is_absolute() or '..' in path.parts:
+            raise ValueError(f'Unsafe image path {name}')
+        try:
+            member = self.media.getmember(name)
+        except KeyError:
+            self.stats['missing images'] += 1
+            return name
+        storage = Recipe._meta.get_field('image').storage
+        with self.media.extractfile(member) as content:
+            return storage.save(name, File(content))
+
+    @transaction.atomic
+    def import_batch(self, records):
+        authors = self.resolve_authors(records)
+        tags = self.resolve_tags(records)
+        ingredients = self.resolve_ingredients(records)
+        existing = set(
+            Recipe.objects.filter(
+                author_id__in=authors.values(),
+                name__in={record['name'] for record in records}
+            ).values_list('author_id', 'name')
+        )
+        pending = []
+        for record in records:
+            author_id = authors.get(record['author']['email'])
+            if author_id is None or (author_id, record['name']) in existing:
+                self.stats['skipped'] += 1
+                continue
+            existing.add((author_id, record['name']))
+            pending.append((record, Recipe(
+                author_id=author_id,
+                name=record['name'],
+                text=record['text'],
+                cooking_time=record['cooking_time'],
+                image=self.unpack_image(record['image'])
+            )))
+        Recipe.objects.bulk_create(recipe for _, recipe in pending)
+        IngredientRecipe.objects.bulk_create(
+            IngredientRecipe(
+                recipe=recipe,
+                ingredient_id=ingredients[
+                    item['name'], item['measurement_unit']
+                ],
+                amount=item['amount']
+            ) for record, recipe in pending for item in record['ingredients']
+        )
+        Recipe.tags.through.objects.bulk_create(
+            Recipe.tags.through(recipe=recipe, tag_id=tags[tag['slug']])
+            for record, recipe in pending for tag in record['tags']
+        )
+        self.author_ids.update(recipe.author_id for _, recipe in pending)
+        self.stats['recipes'] += len(pending)
+
+    def finish(self):
+        """Fix counters, timelines and versions skipped by bulk inserts."""
+        User.objects.filter(pk__in=self.author_ids).update(
+            recipes_count=count_of(Recipe, 'author')
+        )
+        if self.author_ids:
+            timeline.rebuild(user_ids=SubscribeUser.objects.filter(
+                author_id__in=self.author_ids
+            ).values('user_id'))
+        bump_version(RECIPES)
+        bump_version(RECIPE_COUNTS)
+        if self.stats['tags']:
+            bump_version(TAGS)
+        if self.stats['ingredients']:
+            bump_version(INGREDIENTS)
+
+
+def in_range(record, from_id, to_id):
+    return (
+        (from_id is None or record['id'] >= from_id)
+        and (to_id is None or record['id'] <= to_id)
+    )
+
+
+class Command(BaseCommand):
+
+    help = (
+        'Import recipes exported by export_recipes. Disjoint '
+        '--from-id/--to-id ranges of the same file may be imported in '
+        'parallel once its tags, ingredients and authors exist.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help='NDJSON file path, - for stdin')
+        parser.add_argument(
+            '--from-id', type=int, help='first exported recipe id'
+        )
+        parser.add_argument(
+            '--to-id', type=int, help='last exported recipe id'
+        )
+        parser.add_argument(
+            '--media',
+            help='tar file with recipe images made by export_recipes'
+        )
+        parser.add_argument(
+            '--create-authors',
+            action='store_true',
+            help='create missing authors without a usable password'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='recipes inserted per batch'
+        )
+
+    def import_stream(self, stream, importer, kwargs):
+        records = (
+            record for record in ndjson_rows(stream)
+            if in_range(record, kwargs['from_id'], kwargs['to_id'])
+        )
+        for batch in batches(records, kwargs['batch_size']):
+            importer.import_batch(batch)
+            self.stdout.write(
+                f'{importer.stats["recipes"]} recipes imported, '
+                f'{importer.stats["skipped"]} skipped'
+            )
+
+    def handle(self, *args, **kwargs):
+        media = tarfile.open(kwargs['media']) if kwargs['media'] else None
+        importer = RecipeImporter(media, kwargs['create_authors'])
+        try:
+            if kwargs['input'] == '-':
+                self.import_stream(sys.stdin, importer, kwargs)
+            else:
+                with open(kwargs['input'], encoding='utf-8') as stream:
+                    self.import_stream(stream, importer, kwargs)
+        except Exception as ex:
+            raise CommandError(f'Error while import recipes: {ex}')
+        finally:
+            importer.finish()
+            if media is not None:
+                media.close()
+        self.stdout.write(self.style.SUCCESS(
+            ', '.join(
+                f'{count} {name}' for name, count in importer.stats.items()
+            ) or 'Nothing imported'
+        ))
@@ -1,35 +1,221 @@
+import csv
 import json
+import re
+from pathlib import Path
 
 from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 
 from recipes.models import Ingredient, Tag
+from recipes.versions import INGREDIENTS, TAGS, bump_version
+
+BATCH_SIZE = 1000
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = re.compile(r'\s*')
+
+CATALOGS = {
+    'ingredients': (Ingredient, ('name', 'measurement_unit'), INGREDIENTS),
+    'tags': (Tag, ('slug',), TAGS),
+}
+FIELDS = {
+    Ingredient: ('name', 'measurement_unit'),
+    Tag: ('name', 'color', 'slug'),
+}
+FORMATS = {
+    '.json': 'json',
+    '.csv': 'csv',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+}
+
+
+class JSONArrayReader:
+    """Iterate over items of a top level JSON array read in chunks."""
+
+    def __init__(self, stream, chunk_size=CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+        self.item_expected = True
+
+    def read_more(self):
+        chunk = self.stream.read(self.chunk_size)
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        self.eof = not chunk
+        return chunk
+
+    def skip_whitespace(self):
+        while True:
+            self.position = WHITESPACE.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer) or not self.read_more():
+                return self.position < len(self.buffer)
+
+    def decode_buffered(self):
+        """Yield complete items in the buffer, True once ] is reached."""
+        while self.skip_whitespace():
+            char = self.buffer[self.position]
+            if char == ']':
+                return True
+            if not self.item_expected:
+                if char != ',':
+                    raise ValueError(f'Unexpected {char!r} in JSON array')
+                self.position += 1
+                self.item_expected = True
+                continue
+            try:
+                item, self.position = self.decoder.raw_decode(
+                    self.buffer, self.position
+                )
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                return False
+            self.item_expected = False
+            yield item
+        return False
+
+    def __iter__(self):
+        if not self.skip_whitespace() or self.buffer[self.position] != '[':
+            raise ValueError('Expecting a JSON array')
+        self.position += 1
+        while not (yield from self.decode_buffered()):
+            if not self.read_more():
+                raise ValueError('Unexpected end of JSON array')
+
+
+def ndjson_rows(stream):
+    """Yield one JSON object per non empty line."""
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def csv_rows(stream, fields):
+    """Yield CSV rows as dicts, the header row is optional."""
+    reader = csv.reader(stream)
+    first = next(reader, None)
+    if first is None:
+        return
+    if set(first) >= set(fields):
+        fields = first
+    else:
+        yield dict(zip(fields, first))
+    for row in reader:
+        if row:
+            yield dict(zip(fields, row))
+
+
+def batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def upsert(model, key_fields, rows):
+    """Insert new rows, update existing ones found by their natural key.
+
+    Returns numbers of created and updated rows.
+    """
+    fields = FIELDS[model]
+    values = {
+        tuple(row[field] for field in key_fields): {
+            field: row[field] for field in fields if field in row
+        } for row in rows
+    }
+    existing = {}
+    for instance in model.objects.filter(**{
+        f'{key_fields[0]}__in': {key[0] for key in values}
+    }):
+        key = tuple(getattr(instance, field) for field in key_fields)
+        existing.setdefault(key, []).append(instance)
+    to_create, to_update = [], []
+    for key, row in values.items():
+        if key not in existing:
+            to_create.append(model(**row))
+            continue
+        for instance in existing[key]:
+            if any(getattr(instance, name) != value
+                   for name, value in row.items()):
+                for name, value in row.items():
+                    setattr(instance, name, value)
+                to_update.append(instance)
+    model.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+    update_fields = [field for field in fields if field not in key_fields]
+    if to_update and update_fields:
+        model.objects.bulk_update(
+            to_update, update_fields, batch_size=BATCH_SIZE
+        )
+    return len(to_create), len(to_update)
 
 
 class Command(BaseCommand):
 
-    help = 'Load data dump'
+    help = (
+        'Load ingredients or tags from JSON, NDJSON or CSV, updating rows '
+        'with the same name and unit (ingredients) or slug (tags)'
+    )
 
     def add_arguments(self, parser):
         parser.add_argument('--ingredients', action='store_true', required=False)
         parser.add_argument('--tags', action='store_true', required=False)
+        parser.add_argument(
+            '--format',
+            choices=sorted(set(FORMATS.values())),
+            help='file format, guessed from the extension by default'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='rows written per batch'
+        )
         parser.add_argument('datafile', help='full filename path', default=None, type=str)
 
+    def read_rows(self, stream, data_format, fields):
+        if data_format == 'csv':
+            return csv_rows(stream, fields)
+        if data_format == 'ndjson':
+            return ndjson_rows(stream)
+        return iter(JSONArrayReader(stream))
+
     def handle(self, *args, **kwargs):
+        if kwargs['ingredients']:
+            catalog = 'ingredients'
+        elif kwargs['tags']:
+            catalog = 'tags'
+        else:
+            raise CommandError('Pass --ingredients or --tags')
+        model, key_fields, version = CATALOGS[catalog]
+        path = Path(kwargs['datafile'])
+        data_format = kwargs['format'] or FORMATS.get(
+            path.suffix.lower(), 'json'
+        )
+        created = updated = processed = 0
         try:
-            with open(kwargs['datafile'], encoding='utf-8') as fname:
-                data = json.load(fname)
-            if kwargs['ingredients']:
-                for ingredient in data:
-                    Ingredient.objects.create(
-                        name=ingredient['name'],
-                        measurement_unit=ingredient['measurement_unit']
-                    )
-            elif kwargs['tags']:
-                for tag in data:
-                    Tag.objects.create(
-                        name=tag['name'],
-                        color=tag['color'],
-                        slug=tag['slug']
-                    )
+            with open(path, encoding='utf-8', newline='') as stream:
+                rows = self.read_rows(stream, data_format, FIELDS[model])
+                with transaction.atomic():
+                    for batch in batches(rows, kwargs['batch_size']):
+                        batch_created, batch_updated = upsert(
+                            model, key_fields, batch
+                        )
+                        created += batch_created
+                        updated += batch_updated
+                        processed += len(batch)
+                        self.stdout.write(f'{processed} rows processed')
+                    bump_version(version)
         except Exception as ex:
             raise CommandError(f'Error while load data: {ex}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Loaded {processed} {catalog}: '
+            f'{created} created, {updated} updated'
+        ))
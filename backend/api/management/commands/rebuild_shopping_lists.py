@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from recipes import shopping_list
+
+
+class Command(BaseCommand):
+
+    help = 'Check or rebuild materialized shopping lists from carts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='only report rows that differ from carts'
+        )
+        parser.add_argument(
+            '--user',
+            action='append',
+            type=int,
+            dest='users',
+            help='limit to user id, may be repeated'
+        )
+
+    def handle(self, *args, **kwargs):
+        user_ids = kwargs['users']
+        if kwargs['check']:
+            source = shopping_list.source_totals(user_ids)
+            stored = shopping_list.stored_totals(user_ids)
+            drift = {
+                key for key in source.keys() | stored.keys()
+                if source.get(key) != stored.get(key)
+            }
+            for user_id, ingredient_id in sorted(drift):
+                self.stdout.write(
+                    f'user {user_id} ingredient {ingredient_id}: '
+                    f'stored {stored.get((user_id, ingredient_id))}, '
+                    f'expected {source.get((user_id, ingredient_id))}'
+                )
+            self.stdout.write(f'{len(drift)} shopping list rows differ')
+            return
+        rows = shopping_list.rebuild(user_ids)
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt {rows} shopping list rows')
+        )
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from recipes import timeline
+
+
+class Command(BaseCommand):
+
+    help = 'Rebuild subscription feed timelines from subscriptions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            action='append',
+            type=int,
+            dest='users',
+            help='limit to user id, may be repeated'
+        )
+
+    def handle(self, *args, **kwargs):
+        rows = timeline.rebuild(kwargs['users'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt {rows} timeline rows')
+        )
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, PositiveIntegerField, Subquery
+from django.db.models.functions import Coalesce
+
+from recipes.models import FavoriteRecipe, Recipe, ShoppingCart
+from users.models import SubscribeUser, User
+
+
+def count_of(model, field):
+    """Correlated COUNT(*) of model rows pointing at the outer row."""
+    return Coalesce(
+        Subquery(
+            model.objects.filter(
+                **{field: OuterRef('pk')}
+            ).order_by().values(field).annotate(
+                total=Count('pk')
+            ).values('total'),
+            output_field=PositiveIntegerField()
+        ),
+        0
+    )
+
+
+class Command(BaseCommand):
+
+    help = 'Recompute denormalized recipe and user counters'
+
+    def handle(self, *args, **kwargs):
+        with transaction.atomic():
+            recipes = Recipe.objects.update(
+                favorites_count=count_of(FavoriteRecipe, 'recipe'),
+                in_carts_count=count_of(ShoppingCart, 'recipe')
+            )
+            users = User.objects.update(
+                recipes_count=count_of(Recipe, 'author'),
+                subscribers_count=count_of(SubscribeUser, 'author')
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Recomputed counters for {recipes} recipes '
+                f'and {users} users'
+            )
+        )
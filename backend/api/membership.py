@@ -0,0 +1,143 @@
+"""Per-user favorites, shopping cart and subscriptions membership cache."""
+import asyncio
+import hashlib
+from array import array
+from bisect import bisect_left
+
+from django.core.cache import cache
+from django.db import transaction
+
+from api.read_serializers import alist
+from recipes.models import FavoriteRecipe, ShoppingCart
+from users.models import SubscribeUser
+
+CACHE_KEY = 'membership:{}'
+CACHE_TIMEOUT = 60 * 60
+
+
+def _contains(ids, value):
+    index = bisect_left(ids, value)
+    return index < len(ids) and ids[index] == value
+
+
+class Membership:
+    """Sorted id arrays of favorited, carted recipes and followed authors."""
+
+    __slots__ = ('favorites', 'shopping_cart', 'subscriptions')
+
+    def __init__(self, favorites=(), shopping_cart=(), subscriptions=()):
+        self.favorites = array('q', sorted(favorites))
+        self.shopping_cart = array('q', sorted(shopping_cart))
+        self.subscriptions = array('q', sorted(subscriptions))
+
+    def is_favorited(self, recipe_id):
+        return _contains(self.favorites, recipe_id)
+
+    def is_in_shopping_cart(self, recipe_id):
+        return _contains(self.shopping_cart, recipe_id)
+
+    def is_subscribed(self, author_id):
+        return _contains(self.subscriptions, author_id)
+
+    def digest(self):
+        """Short hash of all ids, changes with any membership change."""
+        content = hashlib.sha1()
+        for name in self.__slots__:
+            content.update(getattr(self, name).tobytes())
+            content.update(b'|')
+        return content.hexdigest()
+
+
+def membership_querysets(user):
+    return {
+        'favorites': FavoriteRecipe.objects.filter(
+            user=user
+        ).values_list('recipe_id', flat=True),
+        'shopping_cart': ShoppingCart.objects.filter(
+            user=user
+        ).values_list('recipe_id', flat=True),
+        'subscriptions': SubscribeUser.objects.filter(
+            user=user
+        ).values_list('author_id', flat=True),
+    }
+
+
+def load_membership(user):
+    """Read user's membership ids from the database."""
+    return Membership(**membership_querysets(user))
+
+
+async def aload_membership(user):
+    """load_membership() for async views, the reads run concurrently."""
+    querysets = membership_querysets(user)
+    ids = await asyncio.gather(*map(alist, querysets.values()))
+    return Membership(**dict(zip(querysets, ids)))
+
+
+def cached_membership(user_id):
+    return cache.get(CACHE_KEY.format(user_id))
+
+
+async def acached_membership(user_id):
+    return await cache.aget(CACHE_KEY.format(user_id))
+
+
+def store_membership(user_id, membership):
+    cache.set(CACHE_KEY.format(user_id), membership, CACHE_TIMEOUT)
+    return membership
+
+
+async def astore_membership(user_id, membership):
+    await cache.aset(CACHE_KEY.format(user_id), membership, CACHE_TIMEOUT)
+    return membership
+
+
+def get_membership(user):
+    """Return cached membership for user, loading it on a miss."""
+    return cached_membership(user.pk) or store_membership(
+        user.pk, load_membership(user)
+    )
+
+
+async def aget_membership(user):
+    """get_membership() for async views."""
+    return await acached_membership(user.pk) or await astore_membership(
+        user.pk, await aload_membership(user)
+    )
+
+
+def get_request_membership(request):
+    """Return membership of the request user, once per request."""
+    if request is None or not request.user.is_authenticated:
+        return None
+    if not hasattr(request, 'membership'):
+        request.membership = get_membership(request.user)
+    return request.membership
+
+
+async def aget_request_membership(request):
+    """get_request_membership() for async views.
+
+    Later get_request_membership() calls reuse the loaded membership.
+    """
+    if not request.user.is_authenticated:
+        return None
+    if not hasattr(request, 'membership'):
+        request.membership = await aget_membership(request.user)
+    return request.membership
+
+
+def _delete_membership(user_id):
+    cache.delete(CACHE_KEY.format(user_id))
+
+
+def invalidate_membership(user_id):
+    """Drop the cached membership of a user after a membership write.
+
+    The entry is dropped right away and once more after commit, so no
+    reader keeps ids loaded before the change became visible. Reloading
+    instead of patching the cached arrays keeps concurrent writes of the
+    same user from overwriting each other.
+    """
+    _delete_membership(user_id)
+    transaction.on_commit(lambda: _delete_membership(user_id))
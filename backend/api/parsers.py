@@ -0,0 +1,36 @@
+"""Parsers for api requests."""
+import codecs
+import io
+
+from django.conf import settings
+
+from rest_framework.parsers import JSONParser
+
+from api.renderers import ORJSONRenderer, orjson
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser decoding with orjson when it is installed.
+
+    Bodies orjson rejects are parsed again by JSONParser, so the result
+    or the error message stays the same. Integers beyond 64 bits are
+    read as floats.
+    """
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None or not self.strict:
+            return super().parse(stream, media_type, parser_context)
+        content = stream.read()
+        encoding = (parser_context or {}).get(
+            'encoding', settings.DEFAULT_CHARSET
+        )
+        try:
+            if codecs.lookup(encoding).name != 'utf-8':
+                content = content.decode(encoding)
+            return orjson.loads(content)
+        except (orjson.JSONDecodeError, UnicodeDecodeError):
+            return super().parse(
+                io.BytesIO(content), media_type, parser_context
+            )
@@ -0,0 +1,228 @@
+"""Read-only serializers building plain dicts from values() rows.
+
+They skip DRF field machinery and model instances on the hot GET paths.
+Output must stay identical to RecipeSerializer, UserCustomSerializer
+and SubscriptionListSerializer, which test_read_serializers checks.
+"""
+import asyncio
+from collections import defaultdict
+
+from djoser.serializers import UserSerializer
+
+from recipes.models import IngredientRecipe, Recipe
+from recipes.registry import tag_registry
+
+USER_FIELDS = ('id', 'email', 'username', 'first_name', 'last_name')
+RECIPE_FIELDS = (
+    'id',
+    'name',
+    'image',
+    'image_variants',
+    'text',
+    'cooking_time',
+    'updated_at',
+    'is_favorited',
+    'is_in_shopping_cart',
+    'author_is_subscribed',
+    *(f'author__{field}' for field in USER_FIELDS),
+)
+SHORT_RECIPE_FIELDS = (
+    'id', 'author_id', 'name', 'image', 'image_variants', 'cooking_time'
+)
+SUBSCRIPTION_FIELDS = (*UserSerializer.Meta.fields, 'recipes_count')
+
+
+def image_url(name, request=None):
+    """URL of a stored recipe image as DRF ImageField renders it."""
+    if not name:
+        return None
+    url = Recipe._meta.get_field('image').storage.url(name)
+    if request is not None:
+        return request.build_absolute_uri(url)
+    return url
+
+
+def variant_urls(variants, request=None):
+    """{variant: {extension: url}} of recipe image thumbnails."""
+    return {
+        variant: {
+            extension: image_url(name, request)
+            for extension, name in files.items()
+        } for variant, files in variants.items()
+    }
+
+
+async def alist(queryset):
+    """Evaluate a queryset with the async ORM."""
+    return [item async for item in queryset]
+
+
+def recipe_values(queryset):
+    """Rows for recipes_data() from a Recipe.objects.for_read() queryset."""
+    return queryset.prefetch_related(None).values(*RECIPE_FIELDS)
+
+
+def recipe_tag_ids(recipe_ids):
+    return Recipe.tags.through.objects.filter(
+        recipe_id__in=recipe_ids
+    ).order_by('tag_id').values_list('recipe_id', 'tag_id')
+
+
+def group_tags(rows, tags_by_id):
+    tags = defaultdict(list)
+    for recipe_id, tag_id in rows:
+        tags[recipe_id].append(tags_by_id.get(tag_id))
+    return tags
+
+
+def recipe_tags(recipe_ids):
+    tags_by_id, _ = tag_registry.get_data()
+    return group_tags(recipe_tag_ids(recipe_ids), tags_by_id)
+
+
+def ingredient_rows(recipe_ids):
+    return IngredientRecipe.objects.filter(
+        recipe_id__in=recipe_ids
+    ).order_by('id').values_list(
+        'recipe_id',
+        'ingredient_id',
+        'ingredient__name',
+        'ingredient__measurement_unit',
+        'amount'
+    )
+
+
+def group_ingredients(rows):
+    ingredients = defaultdict(list)
+    for recipe_id, pk, name, measurement_unit, amount in rows:
+        ingredients[recipe_id].append({
+            'id': pk,
+            'name': name,
+            'measurement_unit': measurement_unit,
+            'amount': amount,
+        })
+    return ingredients
+
+
+def recipe_ingredients(recipe_ids):
+    return group_ingredients(ingredient_rows(recipe_ids))
+
+
+def build_recipes(rows, tags, ingredients, request=None):
+    return [
+        {
+            'id': row['id'],
+            'tags': tags[row['id']],
+            'author': {
+                **{
+                    field: row[f'author__{field}'] for field in USER_FIELDS
+                },
+                'is_subscribed': row['author_is_subscribed'],
+            },
+            'ingredients': ingredients[row['id']],
+            'is_favorited': row['is_favorited'],
+            'is_in_shopping_cart': row['is_in_shopping_cart'],
+            'name': row['name'],
+            'image': image_url(row['image'], request),
+            'image_variants': variant_urls(row['image_variants'], request),
+            'text': row['text'],
+            'cooking_time': row['cooking_time'],
+        } for row in rows
+    ]
+
+
+def recipes_data(rows, request=None):
+    """Serialize recipe_values() rows with two more queries in total."""
+    rows = list(rows)
+    recipe_ids = [row['id'] for row in rows]
+    return build_recipes(
+        rows,
+        recipe_tags(recipe_ids),
+        recipe_ingredients(recipe_ids),
+        request
+    )
+
+
+async def arecipes_data(rows, request=None):
+    """recipes_data() for async views, taking already fetched rows."""
+    recipe_ids = [row['id'] for row in rows]
+    tag_ids, ingredients, (tags_by_id, _) = await asyncio.gather(
+        alist(recipe_tag_ids(recipe_ids)),
+        alist(ingredient_rows(recipe_ids)),
+        tag_registry.aget_data()
+    )
+    return build_recipes(
+        rows,
+        group_tags(tag_ids, tags_by_id),
+        group_ingredients(ingredients),
+        request
+    )
+
+
+def user_values(queryset):
+    """Rows for users_data() from a queryset annotated with is_subscribed."""
+    return queryset.values(*USER_FIELDS, 'is_subscribed')
+
+
+def users_data(rows):
+    return [
+        {
+            **{field: row[field] for field in USER_FIELDS},
+            'is_subscribed': row['is_subscribed'],
+        } for row in rows
+    ]
+
+
+def subscription_values(queryset):
+    """Rows for subscriptions_data() from a queryset of followed authors."""
+    return queryset.values(*SUBSCRIPTION_FIELDS)
+
+
+def subscription_recipes(author_ids, recipes_limit=None):
+    if recipes_limit:
+        recipes = Recipe.objects.top_per_author(author_ids, recipes_limit)
+    else:
+        recipes = Recipe.objects.filter(author_id__in=author_ids)
+    return recipes.values(*SHORT_RECIPE_FIELDS)
+
+
+def build_subscriptions(rows, recipes):
+    by_author = defaultdict(list)
+    for recipe in recipes:
+        by_author[recipe['author_id']].append({
+            'id': recipe['id'],
+            'name': recipe['name'],
+            'image': image_url(recipe['image']),
+            'image_variants': variant_urls(recipe['image_variants']),
+            'cooking_time': recipe['cooking_time'],
+        })
+    return [
+        {
+            **{field: row[field] for field in UserSerializer.Meta.fields},
+            'recipes': by_author[row['id']],
+            'recipes_count': row['recipes_count'],
+        } for row in rows
+    ]
+
+
+def subscriptions_data(rows, recipes_limit=None):
+    """Serialize followed authors with their newest recipes.
+
+    Recipes come from one query, ranked per author when limited. Their
+    URLs stay relative like those of RecipeShortSerializer.
+    """
+    rows = list(rows)
+    return build_subscriptions(
+        rows,
+        subscription_recipes([row['id'] for row in rows], recipes_limit)
+    )
+
+
+async def asubscriptions_data(rows, recipes_limit=None):
+    """subscriptions_data() for async views, taking already fetched rows."""
+    return build_subscriptions(
+        rows,
+        await alist(
+            subscription_recipes([row['id'] for row in rows], recipes_limit)
+        )
+    )
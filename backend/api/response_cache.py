@@ -0,0 +1,107 @@
+"""Shared cache of rendered anonymous recipe responses."""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from api.conditional import add_etag, not_modified
+from api.renderers import ORJSONRenderer
+from recipes.versions import (
+    AUTHORS,
+    INGREDIENTS,
+    RECIPES,
+    TAGS,
+    aget_versions,
+    get_versions
+)
+
+CACHE_KEY = 'recipe-response:{}:{}'
+CACHE_HEADER = 'X-Cache'
+
+
+KEY_VERSIONS = (RECIPES, TAGS, INGREDIENTS, AUTHORS)
+
+
+def is_cacheable(request):
+    return (
+        request.method in ('GET', 'HEAD')
+        and not request.user.is_authenticated
+        and isinstance(request.accepted_renderer, ORJSONRenderer)
+    )
+
+
+def make_key(request, versions):
+    params = request.query_params
+    parts = (
+        request.scheme,
+        request.get_host(),
+        request.path,
+        [(name, sorted(params.getlist(name))) for name in sorted(params)]
+    )
+    generation = '.'.join(str(versions[name]) for name in KEY_VERSIONS)
+    return CACHE_KEY.format(
+        generation, hashlib.sha1(repr(parts).encode()).hexdigest()
+    )
+
+
+def response_key(request):
+    """Cache key of a safe anonymous request, None if not cacheable.
+
+    Only JSON is cached, the browsable API carries a per-visitor CSRF
+    token. Host and scheme are part of the key as bodies hold absolute
+    image URLs. The key carries recipe, tag, ingredient and author
+    versions, so any write to them makes older entries unreachable.
+    """
+    if not is_cacheable(request):
+        return None
+    return make_key(request, get_versions(*KEY_VERSIONS))
+
+
+async def aresponse_key(request):
+    """response_key() for async views."""
+    if not is_cacheable(request):
+        return None
+    return make_key(request, await aget_versions(*KEY_VERSIONS))
+
+
+def entry_response(request, entry):
+    if entry is None:
+        return None
+    content, content_type, etag = entry
+    response = not_modified(request, etag) or HttpResponse(
+        content, content_type=content_type
+    )
+    response[CACHE_HEADER] = 'HIT'
+    return add_etag(response, etag)
+
+
+def cached_response(request, key):
+    """Return the cached response for key, None on a miss."""
+    if key is None:
+        return None
+    return entry_response(request, cache.get(key))
+
+
+async def acached_response(request, key):
+    """cached_response() for async views."""
+    if key is None:
+        return None
+    return entry_response(request, await cache.aget(key))
+
+
+def cache_response(response, key, etag):
+    """Store a successful response under key once it is rendered."""
+    if key is None or response.status_code != 200:
+        return response
+
+    def store(rendered):
+        cache.set(
+            key,
+            (rendered.content, rendered['Content-Type'], etag),
+            settings.RECIPE_RESPONSE_CACHE_TIMEOUT
+        )
+
+    response[CACHE_HEADER] = 'MISS'
+    response.add_post_render_callback(store)
+    return response
@@ -1,11 +1,21 @@
 """Serializers for api."""
+import json
+
+from django.conf import settings
+from django.db import transaction
 
 from rest_framework import serializers
+from rest_framework.utils import html
 from rest_framework.validators import UniqueTogetherValidator
 
 from djoser.serializers import UserSerializer
 from drf_extra_fields.fields import Base64ImageField
 
+from api.membership import get_request_membership
+from api.read_serializers import variant_urls
+from api.uploads import TOO_LARGE_ERROR, TOO_MANY_PIXELS_ERROR, image_pixels
+from recipes import shopping_list
+from recipes.images import discard_variants, schedule_variants
 from recipes.models import (
     FavoriteRecipe,
     Ingredient,
@@ -14,10 +24,28 @@ from recipes.models import (
     ShoppingCart,
     Tag
 )
+from recipes.registry import tag_registry
 from users.models import SubscribeUser, User
 
 POSITIVE_ERROR = 'Expecting {} as positive number'
 EMPTY_ERROR = 'Minimun one {} required'
+INGREDIENTS_JSON_ERROR = 'Expecting ingredients as a JSON list'
+MISSING_ID_ERROR = 'Invalid pk "{}" - object does not exist.'
+DUPLICATE_ID_ERROR = 'Duplicate id {}.'
+
+
+def item_errors(ids, known=None):
+    """Per item error for unknown and repeated ids, None for valid ones."""
+    errors, seen = [], set()
+    for pk in ids:
+        if known is not None and pk not in known:
+            errors.append(MISSING_ID_ERROR.format(pk))
+        elif pk in seen:
+            errors.append(DUPLICATE_ID_ERROR.format(pk))
+        else:
+            errors.append(None)
+        seen.add(pk)
+    return errors
 
 
 class UserCustomSerializer(UserSerializer):
@@ -36,12 +64,11 @@ class UserCustomSerializer(UserSerializer):
         ]
 
     def get_is_subscribed(self, obj):
-        user = self.context.get('request').user
-        if user.id:
-            return SubscribeUser.objects.filter(
-                user=user,
-                author=obj.id
-            ).exists()
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
+        membership = get_request_membership(self.context.get('request'))
+        if membership:
+            return membership.is_subscribed(obj.id)
         return False
 
 
@@ -78,9 +105,8 @@ class IngredientRecipeSerializer(serializers.ModelSerializer):
 
 
 class IngredientWriteRecipeSerializer(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(
-        queryset=Ingredient.objects.all()
-    )
+    """Ingredient id and amount, ids are resolved by the parent at once."""
+    id = serializers.IntegerField()
     amount = serializers.IntegerField()
 
     class Meta:
@@ -88,15 +114,76 @@ class IngredientWriteRecipeSerializer(serializers.ModelSerializer):
         fields = ['id', 'amount']
 
 
+class TagRegistryField(serializers.Field):
+    """Tag given by id, resolved from the tag registry."""
+
+    default_error_messages = {
+        'does_not_exist': 'Object with id={value} does not exist.',
+        'invalid': 'Invalid value.',
+    }
+
+    def to_internal_value(self, data):
+        try:
+            tag = tag_registry.get(int(data))
+        except (TypeError, ValueError):
+            self.fail('invalid')
+        if tag is None:
+            self.fail('does_not_exist', value=data)
+        return tag
+
+    def to_representation(self, value):
+        return value.pk
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """URLs of recipe image thumbnails, empty until they are built."""
+
+    def to_representation(self, value):
+        return variant_urls(value, self.context.get('request'))
+
+
+class RecipeImageField(Base64ImageField):
+    """Base64 string or uploaded file, checked against size limits.
+
+    Pixel count comes from the image header before Pillow verifies the
+    file, so oversized bitmaps are never decoded.
+    """
+
+    default_error_messages = {
+        'too_large': TOO_LARGE_ERROR,
+        'too_many_pixels': TOO_MANY_PIXELS_ERROR,
+    }
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            encoded = data.partition(';base64,')[2] or data
+            self.check_size(len(encoded) * 3 // 4)
+            image = super().to_internal_value(data)
+            self.check_pixels(image)
+            return image
+        if hasattr(data, 'read'):
+            self.check_size(data.size)
+            self.check_pixels(data)
+        return serializers.ImageField.to_internal_value(self, data)
+
+    def check_size(self, size):
+        if size > settings.RECIPE_IMAGE_MAX_SIZE:
+            self.fail('too_large', max_size=settings.RECIPE_IMAGE_MAX_SIZE)
+
+    def check_pixels(self, image):
+        pixels = image_pixels(image)
+        if pixels is not None and pixels > settings.RECIPE_IMAGE_MAX_PIXELS:
+            self.fail(
+                'too_many_pixels', max_pixels=settings.RECIPE_IMAGE_MAX_PIXELS
+            )
+
+
 class RecipeModifySerializer(serializers.ModelSerializer):
     ingredients = IngredientWriteRecipeSerializer(many=True)
     tags = serializers.ListField(
-        child=serializers.SlugRelatedField(
-            queryset=Tag.objects.all(),
-            slug_field='id'
-        )
+        child=TagRegistryField()
     )
-    image = Base64ImageField(required=False, allow_null=True)
+    image = RecipeImageField(required=False, allow_null=True)
     author = serializers.HiddenField(
         default=serializers.CurrentUserDefault()
     )
@@ -113,6 +200,23 @@ class RecipeModifySerializer(serializers.ModelSerializer):
             'author'
         ]
 
+    def to_internal_value(self, data):
+        """Accept multipart forms with ingredients sent as a JSON string."""
+        if html.is_html_input(data) and isinstance(
+            data.get('ingredients'), str
+        ):
+            data = {
+                key: data.getlist(key) if key == 'tags' else data[key]
+                for key in data
+            }
+            try:
+                data['ingredients'] = json.loads(data['ingredients'])
+            except ValueError:
+                raise serializers.ValidationError(
+                    {'ingredients': [INGREDIENTS_JSON_ERROR]}
+                )
+        return super().to_internal_value(data)
+
     def validate_cooking_time(self, value):
         if int(value) < 1:
             raise serializers.ValidationError(POSITIVE_ERROR.format('cooking_time'))
@@ -124,11 +228,26 @@ class RecipeModifySerializer(serializers.ModelSerializer):
         for item in value:
             if item['amount'] < 1:
                 raise serializers.ValidationError(POSITIVE_ERROR.format('itgredient_amount'))
-        return value
+        ingredients = Ingredient.objects.in_bulk(
+            {item['id'] for item in value}
+        )
+        errors = item_errors([item['id'] for item in value], ingredients)
+        if any(errors):
+            raise serializers.ValidationError(
+                [{'id': [error]} if error else {} for error in errors]
+            )
+        return [
+            {**item, 'id': ingredients[item['id']]} for item in value
+        ]
 
     def validate_tags(self, value):
         if not value:
             raise serializers.ValidationError(EMPTY_ERROR.format('tag'))
+        errors = item_errors([tag.pk for tag in value])
+        if any(errors):
+            raise serializers.ValidationError(
+                {index: [error] for index, error in enumerate(errors) if error}
+            )
         return value
 
     @staticmethod
@@ -148,26 +267,99 @@ class RecipeModifySerializer(serializers.ModelSerializer):
         recipe = Recipe.objects.create(**validated_data)
         recipe.tags.set(tags)
         self.add_ingredients(recipe, ingredients)
+        schedule_variants(recipe)
         return recipe
 
+    @staticmethod
+    def update_tags(recipe, tags):
+        """Link new tags and unlink dropped ones, return True on change."""
+        links = Recipe.tags.through.objects.filter(recipe=recipe)
+        current = set(links.values_list('tag_id', flat=True))
+        wanted = {tag.pk for tag in tags}
+        if current == wanted:
+            return False
+        links.filter(tag_id__in=current - wanted).delete()
+        Recipe.tags.through.objects.bulk_create(
+            Recipe.tags.through(recipe=recipe, tag_id=tag_id)
+            for tag_id in wanted - current
+        )
+        return True
+
+    @staticmethod
+    def update_ingredients(recipe, ingredients):
+        """Write only added, changed and removed ingredient rows.
+
+        The shopping lists of users having the recipe in their cart get
+        the same difference. Returns True on change.
+        """
+        rows = {
+            row.ingredient_id: row
+            for row in IngredientRecipe.objects.filter(recipe=recipe)
+        }
+        old_amounts = {pk: row.amount for pk, row in rows.items()}
+        new_amounts = {ingr['id'].pk: ingr['amount'] for ingr in ingredients}
+        delta = shopping_list.amounts_delta(old_amounts, new_amounts)
+        if not delta:
+            return False
+        IngredientRecipe.objects.filter(
+            recipe=recipe, ingredient_id__in=old_amounts.keys() - new_amounts
+        ).delete()
+        to_update = []
+        for pk, amount in new_amounts.items():
+            if pk in rows and rows[pk].amount != amount:
+                rows[pk].amount = amount
+                to_update.append(rows[pk])
+        IngredientRecipe.objects.bulk_update(to_update, ['amount'])
+        IngredientRecipe.objects.bulk_create(
+            IngredientRecipe(recipe=recipe, ingredient_id=pk, amount=amount)
+            for pk, amount in new_amounts.items() if pk not in rows
+        )
+        shopping_list.apply_delta(
+            shopping_list.cart_user_ids(recipe.pk), delta
+        )
+        return True
+
+    @transaction.atomic
     def update(self, instance, validated_data):
-        instance.tags.clear()
-        instance.tags.set(validated_data['tags'])
-        instance.ingredients.clear()
-        ingredients = validated_data.pop('ingredients')
-        self.add_ingredients(instance, ingredients)
-        return super().update(instance, validated_data)
+        """Apply only what changed, nothing is written for a no-op edit.
+
+        Missing fields are kept, which makes PATCH a partial update.
+        """
+        tags = validated_data.pop('tags', None)
+        ingredients = validated_data.pop('ingredients', None)
+        changed = [
+            name for name, value in validated_data.items()
+            if getattr(instance, name) != value
+        ]
+        new_image = 'image' in changed and validated_data['image']
+        old_variants = instance.image_variants
+        if new_image:
+            validated_data['image_variants'] = {}
+            changed.append('image_variants')
+        related_changed = [
+            tags is not None and self.update_tags(instance, tags),
+            ingredients is not None and self.update_ingredients(
+                instance, ingredients
+            ),
+        ]
+        if not changed and not any(related_changed):
+            return instance
+        for name in changed:
+            setattr(instance, name, validated_data[name])
+        instance.save(update_fields=[*changed, 'updated_at'])
+        if new_image:
+            discard_variants(old_variants)
+            schedule_variants(instance)
+        return instance
 
 
 class RecipeSerializer(serializers.ModelSerializer):
     author = UserCustomSerializer()
-    tags = TagSerializer(
-        read_only=True,
-        many=True,
-    )
+    tags = serializers.SerializerMethodField()
     ingredients = serializers.SerializerMethodField()
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Recipe
@@ -180,35 +372,42 @@ class RecipeSerializer(serializers.ModelSerializer):
             'is_in_shopping_cart',
             'name',
             'image',
+            'image_variants',
             'text',
             'cooking_time'
         ]
 
+    def to_representation(self, instance):
+        if hasattr(instance, 'author_is_subscribed'):
+            instance.author.is_subscribed = instance.author_is_subscribed
+        return super().to_representation(instance)
+
+    def get_tags(self, obj):
+        return [
+            tag_registry.get_data_by_id(tag.pk) for tag in obj.tags.all()
+        ]
+
     def get_ingredients(self, obj):
         """Check ingredients method."""
-        ingr = IngredientRecipe.objects.filter(
-            recipe=obj.id
-        )
+        ingr = obj.ingredient_recipe.all()
         serializer = IngredientRecipeSerializer(ingr, many=True)
 
         return serializer.data
 
     def get_is_favorited(self, obj):
-        user = self.context.get('request').user
-        if user.is_authenticated:
-            return FavoriteRecipe.objects.filter(
-                user=user,
-                recipe=obj.id
-            ).exists()
+        if hasattr(obj, 'is_favorited'):
+            return obj.is_favorited
+        membership = get_request_membership(self.context.get('request'))
+        if membership:
+            return membership.is_favorited(obj.id)
         return False
 
     def get_is_in_shopping_cart(self, obj):
-        user = self.context.get('request').user
-        if user.is_authenticated:
-            return ShoppingCart.objects.filter(
-                user=user,
-                recipe=obj.id
-            ).exists()
+        if hasattr(obj, 'is_in_shopping_cart'):
+            return obj.is_in_shopping_cart
+        membership = get_request_membership(self.context.get('request'))
+        if membership:
+            return membership.is_in_shopping_cart(obj.id)
         return False
 
 
@@ -226,10 +425,13 @@ class ShoppingCartSerializer(serializers.ModelSerializer):
         ]
 
     def to_representation(self, instance):
-        context = {'request': self.context['request']}
+        request = self.context['request']
+        recipe = Recipe.objects.for_read(request.user).get(
+            pk=instance.recipe_id
+        )
         return RecipeSerializer(
-            instance.recipe,
-            context=context
+            recipe,
+            context={'request': request}
         ).data
 
 
@@ -247,10 +449,13 @@ class FavoritesSerializer(serializers.ModelSerializer):
         ]
 
     def to_representation(self, instance):
-        context = {'request': self.context['request']}
+        request = self.context['request']
+        recipe = Recipe.objects.for_read(request.user).get(
+            pk=instance.recipe_id
+        )
         return RecipeSerializer(
-            instance.recipe,
-            context=context
+            recipe,
+            context={'request': request}
         ).data
 
 
@@ -269,6 +474,7 @@ class SubscriptionSerializer(serializers.ModelSerializer):
 
 
 class RecipeShortSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Recipe
@@ -276,6 +482,7 @@ class RecipeShortSerializer(serializers.ModelSerializer):
             'id',
             'name',
             'image',
+            'image_variants',
             'cooking_time'
         ]
 
@@ -289,14 +496,13 @@ class SubscriptionListSerializer(serializers.ModelSerializer):
         fields = [*UserSerializer.Meta.fields, 'recipes', 'recipes_count']
 
     def get_recipes(self, obj):
-        recipes_limit = self.context.get('recipes_limit', False)
+        recipes_limit = self.context.get('recipes_limit')
         if recipes_limit:
-            recipes_limit = int(recipes_limit)
-            recipes = Recipe.objects.filter(author=obj)[:recipes_limit]
+            recipes = obj.recipes.all()[:recipes_limit]
         else:
-            recipes = Recipe.objects.filter(author=obj)
+            recipes = obj.recipes.all()
         serializer = RecipeShortSerializer(recipes, many=True)
         return serializer.data
 
     def get_recipes_count(self, obj):
-        return obj.recipes.count()
+        return obj.recipes_count
@@ -0,0 +1,80 @@
+"""Streaming shopping list export."""
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+
+from recipes.models import ShoppingListItem
+
+CHUNK_SIZE = 500
+FILENAME = 'shopping_list'
+
+
+def shopping_list_rows(user):
+    """Yield (name, measurement_unit, amount) of user's shopping list."""
+    items = ShoppingListItem.objects.filter(
+        user=user
+    ).order_by(
+        'ingredient__name'
+    ).values_list(
+        'ingredient__name',
+        'ingredient__measurement_unit',
+        'total_amount'
+    )
+    return items.iterator(chunk_size=CHUNK_SIZE)
+
+
+def text_lines(rows):
+    for name, measurement_unit, amount in rows:
+        yield f'{name} ({measurement_unit}) - {amount}\n'
+
+
+class _Echo:
+    """File-like object that hands back what csv.writer writes."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(['name', 'measurement_unit', 'amount'])
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def json_lines(rows):
+    yield '['
+    separator = ''
+    for name, measurement_unit, amount in rows:
+        item = json.dumps(
+            {
+                'name': name,
+                'measurement_unit': measurement_unit,
+                'amount': amount
+            },
+            ensure_ascii=False
+        )
+        yield f'{separator}{item}'
+        separator = ','
+    yield ']'
+
+
+EXPORT_FORMATS = {
+    'txt': ('text/plain', text_lines),
+    'csv': ('text/csv', csv_lines),
+    'json': ('application/json', json_lines),
+}
+
+
+def shopping_list_response(rows, export_format='txt'):
+    """Stream rows to the client in the requested format."""
+    content_type, lines = EXPORT_FORMATS[export_format]
+    response = StreamingHttpResponse(
+        lines(rows),
+        content_type=f'{content_type}; charset=utf-8'
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{FILENAME}.{export_format}"'
+    )
+    return response
@@ -0,0 +1,23 @@
+"""Drop cached memberships when favorites, carts or subscriptions change."""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.membership import invalidate_membership
+from recipes.models import FavoriteRecipe, ShoppingCart
+from users.models import SubscribeUser
+
+
+@receiver(post_save, sender=FavoriteRecipe)
+@receiver(post_save, sender=ShoppingCart)
+@receiver(post_save, sender=SubscribeUser)
+def member_added(sender, instance, created, **kwargs):
+    if created:
+        invalidate_membership(instance.user_id)
+
+
+@receiver(post_delete, sender=FavoriteRecipe)
+@receiver(post_delete, sender=ShoppingCart)
+@receiver(post_delete, sender=SubscribeUser)
+def member_removed(sender, instance, **kwargs):
+    # Also sent for rows removed by cascades and from the admin.
+    invalidate_membership(instance.user_id)
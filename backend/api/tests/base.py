@@ -0,0 +1,152 @@
+"""Shared fixtures and helpers for api tests."""
+import shutil
+import tempfile
+from contextlib import contextmanager
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from recipes.autocomplete import ingredient_index
+from recipes.models import (
+    FavoriteRecipe,
+    Ingredient,
+    IngredientRecipe,
+    Recipe,
+    ShoppingCart,
+    Tag
+)
+from users.models import SubscribeUser, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+
+SMALL_GIF = (
+    'data:image/gif;base64,'
+    'R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7'
+)
+
+AUTHORS = 6
+RECIPES_PER_AUTHOR = 5
+INGREDIENTS_PER_RECIPE = 4
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ApiTestCase(TestCase):
+    """Seed a representative dataset shared by api tests."""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='viewer@foodgram.test',
+            username='viewer',
+            first_name='View',
+            last_name='Er',
+            password='viewer-password'
+        )
+        cls.token = Token.objects.create(user=cls.user)
+        cls.authors = [
+            User.objects.create_user(
+                email=f'author{index}@foodgram.test',
+                username=f'author{index}',
+                first_name='Author',
+                last_name=str(index),
+                password='author-password'
+            ) for index in range(AUTHORS)
+        ]
+        cls.tags = [
+            Tag.objects.create(name=name, color=color, slug=name)
+            for name, color in (
+                ('breakfast', '#E26C2D'),
+                ('lunch', '#49B64E'),
+                ('dinner', '#8775D2'),
+            )
+        ]
+        cls.ingredients = Ingredient.objects.bulk_create(
+            Ingredient(name=f'ingredient {index}', measurement_unit='g')
+            for index in range(10)
+        )
+        cls.recipes = []
+        for author in cls.authors:
+            for index in range(RECIPES_PER_AUTHOR):
+                recipe = Recipe.objects.create(
+                    author=author,
+                    name=f'{author.username} recipe {index}',
+                    text='Some text',
+                    cooking_time=10 + index,
+                    image='recipe_images/test.gif'
+                )
+                recipe.tags.set(cls.tags[index % 2:index % 2 + 2])
+                IngredientRecipe.objects.bulk_create(
+                    IngredientRecipe(
+                        recipe=recipe,
+                        ingredient=ingredient,
+                        amount=index + 1
+                    ) for ingredient in cls.ingredients[
+                        index:index + INGREDIENTS_PER_RECIPE
+                    ]
+                )
+                cls.recipes.append(recipe)
+        cls.own_recipe = Recipe.objects.create(
+            author=cls.user,
+            name='viewer recipe',
+            text='Some text',
+            cooking_time=5,
+            image='recipe_images/test.gif'
+        )
+        cls.own_recipe.tags.set(cls.tags[:1])
+        IngredientRecipe.objects.create(
+            recipe=cls.own_recipe,
+            ingredient=cls.ingredients[0],
+            amount=1
+        )
+        FavoriteRecipe.objects.bulk_create(
+            FavoriteRecipe(user=cls.user, recipe=recipe)
+            for recipe in cls.recipes[::3]
+        )
+        ShoppingCart.objects.bulk_create(
+            ShoppingCart(user=cls.user, recipe=recipe)
+            for recipe in cls.recipes[::2]
+        )
+        SubscribeUser.objects.bulk_create(
+            SubscribeUser(user=cls.user, author=author)
+            for author in cls.authors[:4]
+        )
+        call_command('recompute_counters', stdout=StringIO())
+        call_command('rebuild_shopping_lists', stdout=StringIO())
+        call_command('rebuild_timelines', stdout=StringIO())
+
+    def setUp(self):
+        cache.clear()
+        ingredient_index.invalidate()
+        self.guest_client = APIClient()
+        self.authorized_client = APIClient()
+        self.authorized_client.credentials(
+            HTTP_AUTHORIZATION=f'Token {self.token.key}'
+        )
+
+    @contextmanager
+    def assert_max_queries(self, budget, label=''):
+        """Fail with the captured SQL when more than budget queries run."""
+        with CaptureQueriesContext(connection) as context:
+            yield context
+        executed = len(context)
+        if executed > budget:
+            queries = '\n'.join(
+                f'{number}. {query["sql"]}'
+                for number, query in enumerate(context.captured_queries, 1)
+            )
+            self.fail(
+                f'{label} executed {executed} queries, '
+                f'budget is {budget}:\n{queries}'
+            )
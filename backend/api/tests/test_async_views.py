@@ -0,0 +1,215 @@
+"""Tests for the async read endpoints served under ASGI."""
+import asyncio
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.test import override_settings
+from django.urls import include, path
+
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_201_CREATED,
+    HTTP_304_NOT_MODIFIED,
+    HTTP_401_UNAUTHORIZED,
+    HTTP_404_NOT_FOUND
+)
+from rest_framework.test import APIClient
+
+from asgiref.sync import async_to_sync
+
+from api import catalog
+from api.tests.base import ApiTestCase
+from recipes.versions import (
+    AUTHORS,
+    INGREDIENTS,
+    RECIPE_COUNTS,
+    RECIPES,
+    TAGS,
+    VERSION_KEY
+)
+
+urlpatterns = [
+    path('api/', include('api.async_urls', namespace='api')),
+]
+
+VERSION_KEYS = [
+    VERSION_KEY.format(name)
+    for name in (INGREDIENTS, TAGS, RECIPE_COUNTS, RECIPES, AUTHORS)
+]
+SYNC_CACHE_METHODS = ('get', 'get_many', 'set', 'add', 'incr', 'delete')
+COMPARED_HEADERS = (
+    'Content-Type', 'ETag', 'Vary', 'Allow', 'X-Cache', 'WWW-Authenticate'
+)
+
+
+class AsyncReadTest(ApiTestCase):
+
+    def get_sync(self, url, data=None, token=None):
+        client = APIClient()
+        if token:
+            client.credentials(HTTP_AUTHORIZATION=f'Token {token}')
+        return client.get(url, data)
+
+    def get_async(self, url, data=None, token=None, **headers):
+        """GET through the async URLs with an ASGI request."""
+        if token:
+            headers['AUTHORIZATION'] = f'Token {token}'
+
+        async def get():
+            return await self.async_client.get(url, data, **headers)
+
+        with override_settings(ROOT_URLCONF=__name__):
+            return async_to_sync(get)()
+
+    def reset_caches(self):
+        """Drop cached responses and snapshots, keeping data versions."""
+        versions = cache.get_many(VERSION_KEYS)
+        cache.clear()
+        cache.set_many(versions, None)
+        catalog._snapshots.clear()
+
+    def assert_served_async(self, url, data=None, token=None):
+        """Async response must match the sync one without calling it."""
+        self.reset_caches()
+        expected = self.get_sync(url, data, token)
+        self.reset_caches()
+        with mock.patch(
+            'rest_framework.views.APIView.dispatch',
+            side_effect=AssertionError('sync view called')
+        ):
+            response = self.get_async(url, data, token)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.content, expected.content)
+        for header in COMPARED_HEADERS:
+            self.assertEqual(
+                response.headers.get(header),
+                expected.headers.get(header),
+                header
+            )
+        return response
+
+    def assert_delegated(self, url, data=None, token=None):
+        """Async URLs must answer like the sync view."""
+        self.reset_caches()
+        expected = self.get_sync(url, data, token)
+        self.reset_caches()
+        response = self.get_async(url, data, token)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.content, expected.content)
+
+    def test_recipe_list(self):
+        for data in (
+            None,
+            {'page': 2, 'limit': 4},
+            {'tags': ['lunch', 'dinner'], 'author': self.authors[1].pk},
+        ):
+            with self.subTest(data=data):
+                response = self.assert_served_async('/api/recipes/', data)
+                self.assertEqual(response.status_code, HTTP_200_OK)
+
+    def test_recipe_list_user_filters(self):
+        self.assert_served_async(
+            '/api/recipes/',
+            {'is_favorited': 1, 'is_in_shopping_cart': 1},
+            self.token.key
+        )
+
+    def test_recipe_list_response_cache(self):
+        self.get_async('/api/recipes/')
+        response = self.get_async('/api/recipes/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_recipe_list_not_modified(self):
+        etag = self.get_async('/api/recipes/', token=self.token.key)['ETag']
+        response = self.get_async(
+            '/api/recipes/', token=self.token.key, IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, HTTP_304_NOT_MODIFIED)
+
+    def test_recipe_detail(self):
+        url = f'/api/recipes/{self.recipes[0].pk}/'
+        self.assert_served_async(url)
+        response = self.assert_served_async(url, token=self.token.key)
+        response = self.get_async(
+            url, token=self.token.key, IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, HTTP_304_NOT_MODIFIED)
+
+    def test_tags(self):
+        self.assert_served_async('/api/tags/')
+        self.assert_served_async(f'/api/tags/{self.tags[0].pk}/')
+
+    def test_ingredients(self):
+        self.assert_served_async('/api/ingredients/')
+        self.assert_served_async('/api/ingredients/', {'name': 'ingredient 1'})
+
+    def test_subscriptions(self):
+        for data in (None, {'recipes_limit': 2, 'limit': 2, 'page': 2}):
+            with self.subTest(data=data):
+                self.assert_served_async(
+                    '/api/users/subscriptions/', data, self.token.key
+                )
+
+    def test_errors(self):
+        for url, data, token, status in (
+            ('/api/recipes/', {'page': 100}, None, HTTP_404_NOT_FOUND),
+            ('/api/recipes/0/', None, None, HTTP_404_NOT_FOUND),
+            ('/api/recipes/', None, 'invalid', HTTP_401_UNAUTHORIZED),
+            ('/api/recipes/', None, 'a b', HTTP_401_UNAUTHORIZED),
+            ('/api/users/subscriptions/', None, None, HTTP_401_UNAUTHORIZED),
+        ):
+            with self.subTest(url=url, data=data, token=token):
+                response = self.assert_served_async(url, data, token)
+                self.assertEqual(response.status_code, status)
+
+    def test_cache_not_read_on_event_loop(self):
+        backend = caches['default']
+
+        def off_loop(method):
+            def call(*args, **kwargs):
+                try:
+                    asyncio.get_running_loop()
+                except RuntimeError:
+                    return method(*args, **kwargs)
+                raise AssertionError(f'cache.{method.__name__}() on the loop')
+            return call
+
+        requests = (
+            ('/api/recipes/', None, None),
+            ('/api/recipes/', {'is_favorited': 1}, self.token.key),
+            (f'/api/recipes/{self.recipes[0].pk}/', None, None),
+            (f'/api/recipes/{self.recipes[0].pk}/', None, self.token.key),
+            ('/api/tags/', None, None),
+            ('/api/ingredients/', None, None),
+            ('/api/ingredients/', {'name': 'ingredient'}, None),
+            ('/api/users/subscriptions/', None, self.token.key),
+        )
+        self.reset_caches()
+        with mock.patch.multiple(backend, **{
+            name: off_loop(getattr(backend, name))
+            for name in SYNC_CACHE_METHODS
+        }):
+            for _ in range(2):
+                for url, data, token in requests:
+                    with self.subTest(url=url, data=data, token=token):
+                        response = self.get_async(
+                            url, data, token, IF_NONE_MATCH='"stale"'
+                        )
+                        self.assertEqual(response.status_code, HTTP_200_OK)
+
+    def test_keyset_pages_use_sync_views(self):
+        self.assert_delegated('/api/recipes/', {'cursor': ''})
+
+    def test_browsable_api_uses_sync_views(self):
+        response = self.get_async('/api/recipes/', {'format': 'api'})
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/html'))
+
+    def test_other_methods_use_sync_views(self):
+        with override_settings(ROOT_URLCONF=__name__):
+            response = self.authorized_client.post(
+                f'/api/recipes/{self.recipes[-1].pk}/favorite/'
+            )
+            self.assertEqual(response.status_code, HTTP_201_CREATED)
+            response = self.guest_client.post('/api/recipes/', {})
+        self.assertEqual(response.status_code, HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,102 @@
+"""Tests for ingredient and tag catalogs."""
+import json
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_304_NOT_MODIFIED,
+    HTTP_400_BAD_REQUEST
+)
+
+from api.tests.base import ApiTestCase
+from recipes.models import Tag
+from recipes.registry import tag_registry
+
+
+class CatalogSnapshotTest(ApiTestCase):
+
+    def get(self, url, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.guest_client.get(url, **headers)
+
+    def test_not_modified(self):
+        for url in ('/api/tags/', '/api/ingredients/'):
+            with self.subTest(url=url):
+                response = self.get(url)
+                self.assertEqual(response.status_code, HTTP_200_OK)
+                self.assertIn('max-age', response['Cache-Control'])
+                etag = response['ETag']
+                with self.assertNumQueries(0):
+                    response = self.get(url, etag)
+                self.assertEqual(response.status_code, HTTP_304_NOT_MODIFIED)
+                self.assertEqual(response['ETag'], etag)
+
+    def test_same_payload_as_serializer(self):
+        response = self.get('/api/tags/')
+        self.assertEqual(response.json(), [
+            {'id': tag.id, 'name': tag.name, 'color': tag.color,
+             'slug': tag.slug}
+            for tag in Tag.objects.all()
+        ])
+
+    def test_model_write_bumps_version(self):
+        etag = self.get('/api/tags/')['ETag']
+        Tag.objects.create(name='snack', color='#000000', slug='snack')
+        response = self.get('/api/tags/', etag)
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertIn('snack', [tag['slug'] for tag in response.json()])
+
+    def test_load_data_bumps_version(self):
+        etag = self.get('/api/ingredients/')['ETag']
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as datafile:
+            json.dump([{'name': 'salt', 'measurement_unit': 'g'}], datafile)
+            datafile.flush()
+            call_command(
+                'load_data', '--ingredients', datafile.name, stdout=StringIO()
+            )
+        response = self.get('/api/ingredients/', etag)
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertIn('salt', [item['name'] for item in response.json()])
+
+
+class TagRegistryTest(ApiTestCase):
+
+    def test_lookups_from_memory(self):
+        tag_registry.get_data()
+        with self.assertNumQueries(0):
+            self.assertEqual(tag_registry.get(self.tags[0].pk), self.tags[0])
+            self.assertEqual(
+                tag_registry.get_by_slug('LUNCH').pk, self.tags[1].pk
+            )
+            self.assertIsNone(tag_registry.get(0))
+
+    def test_filter_by_unknown_tag(self):
+        response = self.guest_client.get('/api/recipes/', {'tags': 'nope'})
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+
+    def test_filter_by_tags_is_distinct(self):
+        response = self.guest_client.get(
+            '/api/recipes/', {'tags': ['breakfast', 'lunch'], 'limit': 100}
+        )
+        ids = [recipe['id'] for recipe in response.json()['results']]
+        self.assertEqual(len(ids), len(set(ids)))
+
+    def test_write_with_unknown_tag(self):
+        response = self.authorized_client.patch(
+            f'/api/recipes/{self.own_recipe.id}/',
+            {'tags': [0], 'ingredients': []},
+            format='json'
+        )
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+        self.assertIn('tags', response.json())
+
+    def test_renamed_tag_is_rendered(self):
+        Tag.objects.filter(pk=self.tags[0].pk).update(name='renamed')
+        Tag.objects.get(pk=self.tags[0].pk).save()
+        response = self.guest_client.get(
+            f'/api/recipes/{self.own_recipe.id}/'
+        )
+        self.assertEqual(response.json()['tags'][0]['name'], 'renamed')
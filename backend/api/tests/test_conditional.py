@@ -0,0 +1,87 @@
+"""Tests for conditional GET on recipe endpoints."""
+from django.contrib.auth.models import update_last_login
+
+from rest_framework.status import HTTP_200_OK, HTTP_304_NOT_MODIFIED
+
+from api.tests.base import SMALL_GIF, ApiTestCase
+from recipes.models import Recipe
+
+
+class ConditionalGetTest(ApiTestCase):
+
+    def get(self, client, url, etag=None, **params):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return client.get(url, params, **headers)
+
+    def assert_changed(self, client, url, etag, **params):
+        response = self.get(client, url, etag, **params)
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def assert_not_modified(self, client, url, etag, **params):
+        response = self.get(client, url, etag, **params)
+        self.assertEqual(response.status_code, HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_detail(self):
+        url = f'/api/recipes/{self.recipes[1].id}/'
+        etag = self.get(self.authorized_client, url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assert_not_modified(self.authorized_client, url, etag)
+        self.assertNotEqual(self.get(self.guest_client, url)['ETag'], etag)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.authorized_client.post(f'{url}favorite/')
+        self.assert_changed(self.authorized_client, url, etag)
+
+    def test_detail_changes_on_edit(self):
+        url = f'/api/recipes/{self.own_recipe.id}/'
+        etag = self.get(self.authorized_client, url)['ETag']
+        self.authorized_client.patch(url, {
+            'ingredients': [{'id': self.ingredients[5].id, 'amount': 2}],
+            'tags': [self.tags[2].id],
+            'image': SMALL_GIF,
+            'name': self.own_recipe.name,
+            'text': self.own_recipe.text,
+            'cooking_time': self.own_recipe.cooking_time
+        }, format='json')
+        self.assert_changed(self.authorized_client, url, etag)
+
+    def test_list(self):
+        url = '/api/recipes/'
+        etag = self.get(self.guest_client, url, tags='lunch')['ETag']
+        self.assert_not_modified(self.guest_client, url, etag, tags='lunch')
+        Recipe.objects.filter(pk=self.recipes[-1].pk).delete()
+        self.assert_changed(self.guest_client, url, etag, tags='lunch')
+
+    def test_embedded_catalogs_change_etags(self):
+        urls = ('/api/recipes/', f'/api/recipes/{self.recipes[0].id}/')
+        author = self.recipes[0].author
+        ingredient = self.recipes[0].ingredients.first()
+
+        def rename_author():
+            author.first_name = 'Renamed'
+            author.save()
+
+        for write in (rename_author, ingredient.save):
+            etags = [self.get(self.guest_client, url)['ETag'] for url in urls]
+            with self.captureOnCommitCallbacks(execute=True):
+                write()
+            for url, etag in zip(urls, etags):
+                with self.subTest(url=url):
+                    self.assert_changed(self.guest_client, url, etag)
+
+    def test_login_keeps_etags(self):
+        url = '/api/recipes/'
+        etag = self.get(self.guest_client, url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            update_last_login(None, self.user)
+        self.assert_not_modified(self.guest_client, url, etag)
+
+    def test_list_changes_with_viewer_flags(self):
+        url = '/api/recipes/'
+        etag = self.get(self.authorized_client, url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.authorized_client.post(
+                f'/api/recipes/{self.recipes[1].id}/shopping_cart/'
+            )
+        self.assert_changed(self.authorized_client, url, etag)
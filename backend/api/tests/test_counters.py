@@ -0,0 +1,73 @@
+"""Tests for denormalized recipe and user counters."""
+from io import StringIO
+
+from django.core.management import call_command
+
+from api.tests.base import AUTHORS, RECIPES_PER_AUTHOR, ApiTestCase
+from recipes.models import Recipe
+from users.models import User
+
+
+class CountersTest(ApiTestCase):
+
+    def test_recipe_actions_shift_counters(self):
+        recipe = self.recipes[1]
+        for action, field in (
+            ('favorite', 'favorites_count'),
+            ('shopping_cart', 'in_carts_count'),
+        ):
+            path = f'/api/recipes/{recipe.id}/{action}/'
+            before = getattr(recipe, field)
+            self.authorized_client.post(path)
+            recipe.refresh_from_db()
+            self.assertEqual(getattr(recipe, field), before + 1)
+            self.authorized_client.delete(path)
+            recipe.refresh_from_db()
+            self.assertEqual(getattr(recipe, field), before)
+
+    def test_subscribe_shifts_counter(self):
+        author = self.authors[-1]
+        path = f'/api/users/{author.id}/subscribe/'
+        self.authorized_client.post(path)
+        author.refresh_from_db()
+        self.assertEqual(author.subscribers_count, 1)
+        self.authorized_client.delete(path)
+        author.refresh_from_db()
+        self.assertEqual(author.subscribers_count, 0)
+
+    def test_recipe_delete_shifts_counter(self):
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.recipes_count, 1)
+        self.authorized_client.delete(f'/api/recipes/{self.own_recipe.id}/')
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.recipes_count, 0)
+
+    def test_counter_does_not_go_negative(self):
+        recipe = self.recipes[0]
+        Recipe.objects.filter(pk=recipe.pk).update(favorites_count=0)
+        self.authorized_client.delete(f'/api/recipes/{recipe.id}/favorite/')
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.favorites_count, 0)
+
+    def test_recompute_counters(self):
+        Recipe.objects.update(favorites_count=100, in_carts_count=100)
+        User.objects.update(recipes_count=100, subscribers_count=100)
+        call_command('recompute_counters', stdout=StringIO())
+        favorited = self.recipes[0]
+        favorited.refresh_from_db()
+        self.assertEqual(favorited.favorites_count, 1)
+        self.assertEqual(favorited.in_carts_count, 1)
+        self.assertEqual(
+            Recipe.objects.filter(favorites_count=0).count(),
+            Recipe.objects.count() - len(self.recipes[::3])
+        )
+        author = User.objects.get(pk=self.authors[0].pk)
+        self.assertEqual(author.recipes_count, RECIPES_PER_AUTHOR)
+        self.assertEqual(author.subscribers_count, 1)
+        self.assertEqual(
+            User.objects.filter(subscribers_count=1).count(), 4
+        )
+        self.assertEqual(
+            User.objects.filter(recipes_count=RECIPES_PER_AUTHOR).count(),
+            AUTHORS
+        )
@@ -0,0 +1,127 @@
+"""Tests for cached and estimated recipe list counts."""
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework.status import HTTP_200_OK
+
+from api.tests.base import RECIPES_PER_AUTHOR, ApiTestCase
+from recipes.counts import estimate_count
+from recipes.models import Recipe
+
+
+class RecipeCountTest(ApiTestCase):
+
+    def count_queries(self, client, params=None):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/recipes/', params)
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        counts = [
+            query for query in context.captured_queries
+            if 'COUNT(' in query['sql']
+        ]
+        return response.json(), len(counts)
+
+    def test_count_cached_per_filter(self):
+        author = {'author': self.authors[0].id}
+        body, counts = self.count_queries(self.guest_client, author)
+        self.assertEqual(counts, 1)
+        self.assertEqual(body['count'], RECIPES_PER_AUTHOR)
+        for params in (
+            {**author, 'limit': 2, 'page': 2},
+            {**author, 'limit': 3}
+        ):
+            with self.subTest(params=params):
+                _, counts = self.count_queries(self.guest_client, params)
+                self.assertEqual(counts, 0)
+        _, counts = self.count_queries(self.guest_client)
+        self.assertEqual(counts, 1)
+
+    def test_recipe_changes_reset_counts(self):
+        body, _ = self.count_queries(self.guest_client)
+        total = body['count']
+        recipe = Recipe.objects.create(
+            author=self.user,
+            name='new',
+            text='text',
+            cooking_time=1,
+            image='recipe_images/test.gif'
+        )
+        body, counts = self.count_queries(self.guest_client)
+        self.assertEqual((body['count'], counts), (total + 1, 1))
+        recipe.delete()
+        body, _ = self.count_queries(self.guest_client)
+        self.assertEqual(body['count'], total)
+
+    def test_user_filter_count_follows_membership(self):
+        params = {'is_favorited': 1}
+        body, _ = self.count_queries(self.authorized_client, params)
+        total = body['count']
+        recipe = self.recipes[1]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.authorized_client.post(
+                f'/api/recipes/{recipe.id}/favorite/'
+            )
+        body, _ = self.count_queries(self.authorized_client, params)
+        self.assertEqual(body['count'], total + 1)
+
+    def test_estimated_count_flagged(self):
+        with mock.patch('recipes.counts.estimate_count', return_value=1000):
+            body, counts = self.count_queries(
+                self.guest_client, {'page': 50, 'limit': 16}
+            )
+        self.assertEqual(counts, 0)
+        self.assertEqual(body['count'], 1000)
+        self.assertIs(body['count_approximate'], True)
+        self.assertEqual(body['results'], [])
+
+    def test_underestimated_count_reaches_all_rows(self):
+        ids, page, more = [], 1, True
+        with mock.patch('recipes.counts.estimate_count', return_value=3):
+            while more:
+                body, _ = self.count_queries(
+                    self.guest_client, {'limit': 4, 'page': page}
+                )
+                self.assertEqual(body['count'], 3)
+                ids.extend(recipe['id'] for recipe in body['results'])
+                page, more = page + 1, body['next'] is not None
+        self.assertEqual(
+            ids, list(Recipe.objects.order_by('-id').values_list(
+                'id', flat=True
+            ))
+        )
+
+    def test_estimated_list_etag_follows_deletes(self):
+        with mock.patch('recipes.counts.estimate_count', return_value=1000):
+            etag = self.guest_client.get('/api/recipes/')['ETag']
+            with self.captureOnCommitCallbacks(execute=True):
+                Recipe.objects.order_by('id').first().delete()
+            response = self.guest_client.get(
+                '/api/recipes/', HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, HTTP_200_OK)
+
+    def test_exact_count_not_flagged(self):
+        body, _ = self.count_queries(self.guest_client)
+        self.assertNotIn('count_approximate', body)
+        self.assertIsNone(estimate_count(Recipe.objects.all()))
+
+    def test_stats_skip_user_annotations(self):
+        with CaptureQueriesContext(connection) as context:
+            self.authorized_client.get('/api/recipes/')
+        aggregates = [
+            query['sql'] for query in context.captured_queries
+            if 'COUNT(' in query['sql']
+        ]
+        self.assertEqual(len(aggregates), 1)
+        self.assertIn('MAX(', aggregates[0])
+        self.assertNotIn('EXISTS', aggregates[0])
+
+    def test_last_modified_cached_with_count(self):
+        self.count_queries(self.guest_client, {'page': 2})
+        with CaptureQueriesContext(connection) as context:
+            self.authorized_client.get('/api/recipes/', {'page': 2})
+        self.assertFalse(any(
+            'MAX(' in query['sql'] for query in context.captured_queries
+        ))
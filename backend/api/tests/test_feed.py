@@ -0,0 +1,83 @@
+"""Tests for the subscription feed and its timelines."""
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+
+from rest_framework.status import HTTP_200_OK, HTTP_401_UNAUTHORIZED
+
+from api.tests.base import ApiTestCase
+from recipes.models import Recipe, TimelineEntry
+
+
+class FeedTest(ApiTestCase):
+
+    def feed_ids(self, client=None, limit=4):
+        """Walk all feed pages, return recipe ids in order."""
+        client = client or self.authorized_client
+        ids = []
+        response = client.get('/api/recipes/feed/', {'limit': limit})
+        while True:
+            self.assertEqual(response.status_code, HTTP_200_OK)
+            data = response.json()
+            ids.extend(recipe['id'] for recipe in data['results'])
+            if not data['next']:
+                return ids
+            response = client.get(data['next'])
+
+    def expected_ids(self, authors):
+        return list(Recipe.objects.filter(
+            author__in=authors
+        ).order_by('-id').values_list('id', flat=True))
+
+    def add_recipe(self, author):
+        author.refresh_from_db()
+        return Recipe.objects.create(
+            author=author,
+            name='fresh recipe',
+            text='Some text',
+            cooking_time=5,
+            image='recipe_images/test.gif'
+        )
+
+    def test_followed_authors_newest_first(self):
+        self.assertEqual(self.feed_ids(), self.expected_ids(self.authors[:4]))
+
+    def test_requires_authentication(self):
+        response = self.guest_client.get('/api/recipes/feed/')
+        self.assertEqual(response.status_code, HTTP_401_UNAUTHORIZED)
+
+    def test_new_recipe_is_fanned_out(self):
+        recipe = self.add_recipe(self.authors[0])
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.user, recipe=recipe).exists()
+        )
+        self.assertEqual(self.feed_ids()[0], recipe.id)
+
+    @override_settings(FEED_FANOUT_MAX_SUBSCRIBERS=0)
+    def test_followed_by_many_is_merged_on_read(self):
+        recipe = self.add_recipe(self.authors[0])
+        self.assertFalse(recipe.timeline_entries.exists())
+        self.assertEqual(self.feed_ids(), self.expected_ids(self.authors[:4]))
+
+    @override_settings(FEED_BACKFILL_SIZE=2)
+    def test_subscribe_backfills_and_unsubscribe_trims(self):
+        author = self.authors[-1]
+        path = f'/api/users/{author.id}/subscribe/'
+        self.authorized_client.post(path)
+        self.assertEqual(
+            list(TimelineEntry.objects.filter(
+                user=self.user, recipe__author=author
+            ).order_by('-recipe_id').values_list('recipe_id', flat=True)),
+            self.expected_ids([author])[:2]
+        )
+        self.authorized_client.delete(path)
+        self.assertFalse(TimelineEntry.objects.filter(
+            user=self.user, recipe__author=author
+        ).exists())
+        self.assertEqual(self.feed_ids(), self.expected_ids(self.authors[:4]))
+
+    def test_rebuild_timelines(self):
+        TimelineEntry.objects.all().delete()
+        call_command('rebuild_timelines', stdout=StringIO())
+        self.assertEqual(self.feed_ids(), self.expected_ids(self.authors[:4]))
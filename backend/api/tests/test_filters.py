@@ -0,0 +1,75 @@
+"""Tests for recipe list filters."""
+from rest_framework.status import HTTP_200_OK
+
+from api.tests.base import ApiTestCase
+from recipes.models import FavoriteRecipe, Recipe, ShoppingCart
+
+
+class RecipeFilterTest(ApiTestCase):
+
+    def get_ids(self, client, params):
+        response = client.get('/api/recipes/', {**params, 'limit': 100})
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        ids = [item['id'] for item in response.json()['results']]
+        self.assertEqual(len(ids), len(set(ids)))
+        return set(ids)
+
+    def ids_of(self, recipes):
+        return set(recipes.values_list('id', flat=True))
+
+    def test_user_flags(self):
+        cases = (
+            ('is_favorited', FavoriteRecipe),
+            ('is_in_shopping_cart', ShoppingCart),
+        )
+        for name, model in cases:
+            marked = self.ids_of(
+                Recipe.objects.filter(
+                    pk__in=model.objects.filter(
+                        user=self.user
+                    ).values('recipe')
+                )
+            )
+            with self.subTest(name=name):
+                self.assertEqual(
+                    self.get_ids(self.authorized_client, {name: 1}), marked
+                )
+                self.assertEqual(
+                    self.get_ids(self.authorized_client, {name: 0}),
+                    self.ids_of(Recipe.objects.exclude(pk__in=marked))
+                )
+
+    def test_user_flags_ignored_for_guests(self):
+        everything = self.ids_of(Recipe.objects.all())
+        for params in ({'is_favorited': 1}, {'is_in_shopping_cart': 0}):
+            with self.subTest(params=params):
+                self.assertEqual(
+                    self.get_ids(self.guest_client, params), everything
+                )
+
+    def test_tags_match_any(self):
+        ids = self.get_ids(
+            self.guest_client, {'tags': ['breakfast', 'lunch', 'dinner']}
+        )
+        self.assertEqual(
+            ids, self.ids_of(Recipe.objects.filter(tags__isnull=False))
+        )
+
+    def test_tags_match_all(self):
+        ids = self.get_ids(
+            self.guest_client,
+            {'tags': ['breakfast', 'lunch'], 'tags_match': 'all'}
+        )
+        self.assertEqual(
+            ids,
+            self.ids_of(
+                Recipe.objects.filter(tags=self.tags[0]).filter(
+                    tags=self.tags[1]
+                )
+            )
+        )
+        self.assertTrue(ids)
+        self.assertFalse(self.get_ids(
+            self.guest_client,
+            {'tags': ['breakfast', 'dinner'], 'tags_match': 'all'}
+        ))
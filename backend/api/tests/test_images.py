@@ -0,0 +1,140 @@
+"""Tests for recipe image thumbnails."""
+import os
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import override_settings
+
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_201_CREATED,
+    HTTP_204_NO_CONTENT
+)
+
+from PIL import Image
+
+from api.tests.base import SMALL_GIF, TEMP_MEDIA_ROOT, ApiTestCase
+from recipes.images import FORMATS, VARIANTS, build_variants
+from recipes.models import Recipe
+
+
+@override_settings(IMAGE_VARIANTS_ASYNC=False)
+class ImageVariantsTest(ApiTestCase):
+
+    def create_recipe(self):
+        payload = {
+            'ingredients': [{'id': self.ingredients[0].id, 'amount': 1}],
+            'tags': [self.tags[0].id],
+            'image': SMALL_GIF,
+            'name': 'with image',
+            'text': 'text',
+            'cooking_time': 1,
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.authorized_client.post(
+                '/api/recipes/', payload, format='json'
+            )
+        self.assertEqual(response.status_code, HTTP_201_CREATED)
+        return Recipe.objects.get(pk=response.json()['id'])
+
+    def test_variants_built_after_upload(self):
+        recipe = self.create_recipe()
+        self.assertEqual(set(recipe.image_variants), set(VARIANTS))
+        for variant, files in recipe.image_variants.items():
+            self.assertEqual(set(files), set(FORMATS))
+            for extension, name in files.items():
+                with Image.open(os.path.join(TEMP_MEDIA_ROOT, name)) as image:
+                    self.assertEqual(image.size, VARIANTS[variant])
+                    self.assertEqual(image.format, FORMATS[extension])
+
+    def test_serializers_expose_urls(self):
+        recipe = self.create_recipe()
+        body = self.guest_client.get(f'/api/recipes/{recipe.id}/').json()
+        url = body['image_variants']['card']['webp']
+        self.assertTrue(url.startswith('http://testserver/'))
+        self.assertTrue(url.endswith('.webp'))
+        Recipe.objects.filter(author=self.authors[0]).update(
+            image_variants=recipe.image_variants
+        )
+        authors = self.authorized_client.get(
+            '/api/users/subscriptions/', {'recipes_limit': 1}
+        ).json()['results']
+        short = next(
+            author['recipes'][0] for author in authors
+            if author['id'] == self.authors[0].id
+        )
+        self.assertTrue(url.endswith(short['image_variants']['card']['webp']))
+
+    def test_upload_is_not_processed_in_request(self):
+        with override_settings(IMAGE_VARIANTS_ASYNC=True), mock.patch(
+            'recipes.images.image_workers.submit'
+        ) as submit:
+            recipe = self.create_recipe()
+        submit.assert_called_once()
+        self.assertEqual(
+            submit.call_args.args[1:], (recipe.pk, recipe.image.name)
+        )
+        self.assertEqual(recipe.image_variants, {})
+
+    def test_replaced_image_variants_discarded(self):
+        recipe = self.create_recipe()
+        name = recipe.image.name
+        Recipe.objects.filter(pk=recipe.pk).update(image='other.gif')
+        self.assertIsNone(build_variants(recipe.pk, name))
+
+    def variant_paths(self, recipe):
+        return [
+            os.path.join(TEMP_MEDIA_ROOT, name)
+            for files in recipe.image_variants.values()
+            for name in files.values()
+        ]
+
+    def test_replaced_image_variants_deleted(self):
+        recipe = self.create_recipe()
+        old_paths = self.variant_paths(recipe)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.authorized_client.patch(
+                f'/api/recipes/{recipe.pk}/', {'image': SMALL_GIF},
+                format='json'
+            )
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        recipe.refresh_from_db()
+        self.assertEqual(set(recipe.image_variants), set(VARIANTS))
+        for path in old_paths:
+            self.assertFalse(os.path.exists(path), path)
+        for path in self.variant_paths(recipe):
+            self.assertTrue(os.path.exists(path), path)
+
+    def test_deleted_recipe_variants_deleted(self):
+        recipe = self.create_recipe()
+        paths = self.variant_paths(recipe)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.authorized_client.delete(
+                f'/api/recipes/{recipe.pk}/'
+            )
+        self.assertEqual(response.status_code, HTTP_204_NO_CONTENT)
+        for path in paths:
+            self.assertFalse(os.path.exists(path), path)
+
+    def test_rebuild_deletes_previous_variants(self):
+        recipe = self.create_recipe()
+        old_paths = self.variant_paths(recipe)
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command(
+                'build_image_variants', '--all',
+                stdout=StringIO(), stderr=StringIO()
+            )
+        recipe.refresh_from_db()
+        for path in old_paths:
+            self.assertFalse(os.path.exists(path), path)
+        for path in self.variant_paths(recipe):
+            self.assertTrue(os.path.exists(path), path)
+
+    def test_backfill_command(self):
+        recipe = self.create_recipe()
+        Recipe.objects.filter(pk=recipe.pk).update(image_variants={})
+        stdout = StringIO()
+        call_command('build_image_variants', stdout=stdout, stderr=StringIO())
+        recipe.refresh_from_db()
+        self.assertEqual(set(recipe.image_variants), set(VARIANTS))
@@ -0,0 +1,43 @@
+"""Tests for ingredient autocomplete."""
+from rest_framework.status import HTTP_200_OK
+
+from api.tests.base import ApiTestCase
+from recipes.autocomplete import ingredient_index
+from recipes.models import Ingredient
+
+URL = '/api/ingredients/'
+
+
+class IngredientSearchTest(ApiTestCase):
+
+    def search(self, name):
+        response = self.guest_client.get(URL, {'name': name})
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        return [item['name'] for item in response.json()]
+
+    def test_prefix_then_substring(self):
+        Ingredient.objects.bulk_create([
+            Ingredient(name='Сахар', measurement_unit='г'),
+            Ingredient(name='сахарная пудра', measurement_unit='г'),
+            Ingredient(name='ванильный сахар', measurement_unit='г'),
+        ])
+        ingredient_index.invalidate()
+        self.assertEqual(
+            self.search('САХ'),
+            ['Сахар', 'сахарная пудра', 'ванильный сахар']
+        )
+
+    def test_no_database_queries(self):
+        self.search('ingr')
+        with self.assertNumQueries(0):
+            self.assertEqual(len(self.search('ingredient 1')), 1)
+
+    def test_invalidated_on_change(self):
+        self.assertEqual(self.search('tomato'), [])
+        Ingredient.objects.create(name='Tomato', measurement_unit='g')
+        self.assertEqual(self.search('tomato'), ['Tomato'])
+
+    def test_without_name(self):
+        response = self.guest_client.get(URL)
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(len(response.json()), len(self.ingredients))
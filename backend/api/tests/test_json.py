@@ -0,0 +1,155 @@
+"""Conformance of orjson renderer and parser with DRF's JSON classes."""
+import datetime
+import io
+import uuid
+from collections import OrderedDict
+from decimal import Decimal
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from api.parsers import ORJSONParser
+from api.renderers import ORJSONRenderer
+from api.tests.base import ApiTestCase
+
+UTC = datetime.timezone.utc
+
+SAMPLES = [
+    None,
+    {'id': 1, 'name': 'Борщ 🍲', 'ok': True, 'none': None, 'rate': 2.5},
+    [1, -2, 2 ** 63, 0.1, 1.0, '', 'quote " back \\ slash'],
+    {'at': datetime.datetime(2026, 10, 18, 3, 40, 5, 123456, tzinfo=UTC)},
+    {'at': datetime.datetime(2026, 10, 18, 3, 40, 5)},
+    {'at': datetime.datetime(
+        2026, 10, 18, 3, 40, 5, 5000,
+        tzinfo=datetime.timezone(datetime.timedelta(hours=3))
+    )},
+    {'day': datetime.date(2026, 10, 18), 'time': datetime.time(3, 4, 5, 6)},
+    {'duration': datetime.timedelta(days=1, seconds=5)},
+    {'price': Decimal('10.50'), 'id': uuid.UUID(int=42)},
+    {'message': gettext_lazy('This field is required.')},
+    {0: ['first error'], 3: ['fourth error']},
+    {'set': {7}, 'tuple': (1, 2), 'bytes': b'raw'},
+    {'separators': 'line\u2028paragraph\u2029end'},
+    ReturnDict(
+        [('b', 1), ('a', ReturnList([OrderedDict(c=2)], serializer=None))],
+        serializer=None
+    ),
+    {'huge': 2 ** 70},
+]
+
+
+class ORJSONRendererTest(SimpleTestCase):
+
+    def test_same_output_as_json_renderer(self):
+        for data in SAMPLES:
+            with self.subTest(data=data):
+                self.assertEqual(
+                    ORJSONRenderer().render(data),
+                    JSONRenderer().render(data)
+                )
+
+    def test_indent_is_rendered_by_json_renderer(self):
+        data = {'a': [1, 2]}
+        for media_type in ('application/json; indent=4', None):
+            context = {} if media_type else {'indent': 2}
+            self.assertEqual(
+                ORJSONRenderer().render(data, media_type, context),
+                JSONRenderer().render(data, media_type, context)
+            )
+
+    def test_unsupported_value_errors_like_json_renderer(self):
+        for data in (object(), datetime.time(1, tzinfo=UTC)):
+            with self.subTest(data=data):
+                with self.assertRaises(Exception) as expected:
+                    JSONRenderer().render(data)
+                with self.assertRaises(type(expected.exception)) as raised:
+                    ORJSONRenderer().render(data)
+                self.assertEqual(
+                    str(raised.exception), str(expected.exception)
+                )
+
+    @mock.patch('api.renderers.orjson', None)
+    def test_without_orjson(self):
+        for data in SAMPLES:
+            self.assertEqual(
+                ORJSONRenderer().render(data), JSONRenderer().render(data)
+            )
+
+
+class ORJSONParserTest(SimpleTestCase):
+
+    def parse(self, parser, content, encoding='utf-8'):
+        return parser.parse(
+            io.BytesIO(content), 'application/json', {'encoding': encoding}
+        )
+
+    def assert_same(self, content, encoding='utf-8'):
+        try:
+            expected = self.parse(JSONParser(), content, encoding)
+        except ParseError as error:
+            with self.assertRaises(ParseError) as raised:
+                self.parse(ORJSONParser(), content, encoding)
+            self.assertEqual(raised.exception.detail, error.detail)
+            return
+        self.assertEqual(self.parse(ORJSONParser(), content, encoding), expected)
+
+    def test_same_result_as_json_parser(self):
+        for content in (
+            b'{"ingredients": [{"id": 1, "amount": 2}], "name": "\\u0411"}',
+            '{"name": "Борщ 🍲", "rate": 1.5e3}'.encode(),
+            b'[true, false, null, -0, 1E2]',
+            b' "text" ',
+        ):
+            with self.subTest(content=content):
+                self.assert_same(content)
+
+    def test_same_errors_as_json_parser(self):
+        for content in (b'', b'{', b'{"a": NaN}', b'[1,]', b'\xff'):
+            with self.subTest(content=content):
+                self.assert_same(content)
+
+    def test_other_encoding(self):
+        self.assert_same('{"name": "café"}'.encode('latin-1'), 'latin-1')
+
+    @mock.patch('api.parsers.orjson', None)
+    def test_without_orjson(self):
+        self.assert_same(b'{"a": [1, 2]}')
+        self.assert_same(b'{"a": Infinity}')
+
+
+class ApiResponseTest(ApiTestCase):
+
+    def test_api_responses_match_json_renderer(self):
+        recipe = self.recipes[0]
+        for path in (
+            '/api/recipes/?limit=50',
+            f'/api/recipes/{recipe.id}/',
+            '/api/users/subscriptions/',
+            '/api/users/me/',
+        ):
+            with self.subTest(path=path):
+                response = self.authorized_client.get(path)
+                self.assertIsInstance(
+                    response.accepted_renderer, ORJSONRenderer
+                )
+                self.assertEqual(
+                    response.content, JSONRenderer().render(response.data)
+                )
+
+    def test_validation_errors_match_json_renderer(self):
+        response = self.authorized_client.post(
+            '/api/recipes/',
+            '{"tags": [1, 1], "ingredients": [{"id": 0, "amount": 1}]}',
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.content, JSONRenderer().render(response.data)
+        )
@@ -0,0 +1,109 @@
+"""Tests for the catalog loader command."""
+import io
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from api.management.commands.load_data import JSONArrayReader
+from recipes.models import Ingredient, Tag
+from recipes.versions import INGREDIENTS, TAGS, get_version
+
+INGREDIENTS_ROWS = [
+    {'name': 'flour', 'measurement_unit': 'g'},
+    {'name': 'milk', 'measurement_unit': 'ml'},
+    {'name': 'milk', 'measurement_unit': 'cup'},
+]
+
+
+class LoadDataTest(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as datafile:
+            datafile.write(content)
+        return path
+
+    def load(self, path, *options):
+        stdout = StringIO()
+        call_command('load_data', *options, path, stdout=stdout)
+        return stdout.getvalue()
+
+    def ingredients(self):
+        return sorted(
+            Ingredient.objects.values_list('name', 'measurement_unit')
+        )
+
+    def test_formats(self):
+        expected = sorted(
+            (row['name'], row['measurement_unit']) for row in INGREDIENTS_ROWS
+        )
+        files = (
+            ('data.json', json.dumps(INGREDIENTS_ROWS, indent=2)),
+            ('data.ndjson', '\n'.join(map(json.dumps, INGREDIENTS_ROWS))),
+            ('data.csv', 'name,measurement_unit\nflour,g\nmilk,ml\nmilk,cup\n'),
+            ('plain.csv', 'flour,g\nmilk,ml\nmilk,cup\n'),
+        )
+        for name, content in files:
+            with self.subTest(name=name):
+                Ingredient.objects.all().delete()
+                output = self.load(self.write(name, content), '--ingredients')
+                self.assertEqual(self.ingredients(), expected)
+                self.assertIn('3 created, 0 updated', output)
+
+    def test_rerun_does_not_duplicate(self):
+        path = self.write('data.json', json.dumps(INGREDIENTS_ROWS))
+        self.load(path, '--ingredients', '--batch-size', '2')
+        version = get_version(INGREDIENTS)
+        output = self.load(path, '--ingredients', '--batch-size', '2')
+        self.assertEqual(Ingredient.objects.count(), 3)
+        self.assertIn('0 created, 0 updated', output)
+        self.assertIn('2 rows processed', output)
+        self.assertNotEqual(get_version(INGREDIENTS), version)
+
+    def test_tags_updated_by_slug(self):
+        Tag.objects.create(name='Old', color='#000000', slug='lunch')
+        rows = [
+            {'name': 'Lunch', 'color': '#FFA500', 'slug': 'lunch'},
+            {'name': 'Dinner', 'color': '#008000', 'slug': 'dinner'},
+        ]
+        version = get_version(TAGS)
+        output = self.load(self.write('tags.json', json.dumps(rows)), '--tags')
+        self.assertIn('1 created, 1 updated', output)
+        self.assertEqual(
+            sorted(Tag.objects.values_list('slug', 'name', 'color')),
+            [('dinner', 'Dinner', '#008000'), ('lunch', 'Lunch', '#FFA500')]
+        )
+        self.assertNotEqual(get_version(TAGS), version)
+
+    def test_failure_rolls_back(self):
+        content = json.dumps(INGREDIENTS_ROWS)[:-1] + ', {"name": "salt"}]'
+        with self.assertRaises(CommandError):
+            self.load(
+                self.write('data.json', content),
+                '--ingredients', '--batch-size', '1'
+            )
+        self.assertFalse(Ingredient.objects.exists())
+
+    def test_json_reader_chunks(self):
+        content = json.dumps(
+            [{'name': 'a , ] [ b', 'nested': [1, {'x': '}'}]}, {}] * 3
+        )
+        for chunk_size in (1, 2, 7, len(content)):
+            with self.subTest(chunk_size=chunk_size):
+                rows = list(JSONArrayReader(io.StringIO(content), chunk_size))
+                self.assertEqual(rows, json.loads(content))
+
+    def test_json_reader_errors(self):
+        for content in ('{}', '[{"a": 1} {"b": 2}]', '[{"a": 1},', ''):
+            with self.subTest(content=content):
+                with self.assertRaises(ValueError):
+                    list(JSONArrayReader(io.StringIO(content), 4))
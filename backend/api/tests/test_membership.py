@@ -0,0 +1,71 @@
+"""Tests for the per-user membership cache."""
+from api.membership import get_membership
+from api.tests.base import ApiTestCase
+from recipes.models import FavoriteRecipe, Recipe
+
+
+class MembershipTest(ApiTestCase):
+
+    def test_loaded_once(self):
+        with self.assertNumQueries(3):
+            membership = get_membership(self.user)
+        with self.assertNumQueries(0):
+            self.assertIs(get_membership(self.user).is_favorited(
+                self.recipes[0].id
+            ), True)
+        self.assertEqual(
+            list(membership.favorites),
+            sorted(recipe.id for recipe in self.recipes[::3])
+        )
+        self.assertFalse(membership.is_in_shopping_cart(self.recipes[1].id))
+        self.assertTrue(membership.is_subscribed(self.authors[0].id))
+        self.assertFalse(membership.is_subscribed(self.authors[-1].id))
+
+    def test_recipe_actions_keep_cache_consistent(self):
+        get_membership(self.user)
+        recipe_id = self.recipes[1].id
+        for action, check in (
+            ('favorite', 'is_favorited'),
+            ('shopping_cart', 'is_in_shopping_cart'),
+        ):
+            path = f'/api/recipes/{recipe_id}/{action}/'
+            with self.captureOnCommitCallbacks(execute=True):
+                self.authorized_client.post(path)
+            self.assertTrue(getattr(get_membership(self.user), check)(
+                recipe_id
+            ))
+            with self.captureOnCommitCallbacks(execute=True):
+                self.authorized_client.delete(path)
+            self.assertFalse(getattr(get_membership(self.user), check)(
+                recipe_id
+            ))
+
+    def test_subscribe_keeps_cache_consistent(self):
+        get_membership(self.user)
+        author_id = self.authors[-1].id
+        path = f'/api/users/{author_id}/subscribe/'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.authorized_client.post(path)
+        self.assertTrue(get_membership(self.user).is_subscribed(author_id))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.authorized_client.delete(path)
+        self.assertFalse(get_membership(self.user).is_subscribed(author_id))
+
+    def test_cascade_delete_drops_cache(self):
+        recipe_id = self.recipes[0].id
+        self.assertTrue(get_membership(self.user).is_favorited(recipe_id))
+        with self.captureOnCommitCallbacks(execute=True):
+            Recipe.objects.filter(pk=recipe_id).delete()
+        membership = get_membership(self.user)
+        self.assertFalse(membership.is_favorited(recipe_id))
+        self.assertFalse(membership.is_in_shopping_cart(recipe_id))
+
+    def test_writes_reload_instead_of_patching(self):
+        get_membership(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            FavoriteRecipe.objects.create(
+                user=self.user, recipe=self.recipes[1]
+            )
+        with self.assertNumQueries(3):
+            membership = get_membership(self.user)
+        self.assertTrue(membership.is_favorited(self.recipes[1].id))
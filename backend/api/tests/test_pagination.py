@@ -0,0 +1,87 @@
+"""Tests for page number and keyset pagination."""
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework.status import HTTP_200_OK, HTTP_304_NOT_MODIFIED
+
+from api.tests.base import ApiTestCase
+from recipes.models import Recipe
+from recipes.pagination import MAX_PAGE_SIZE
+
+
+class PaginationTest(ApiTestCase):
+
+    def walk(self, client, url, limit):
+        ids = []
+        params = {'cursor': '', 'limit': limit}
+        while True:
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url, params)
+            self.assertEqual(response.status_code, HTTP_200_OK)
+            self.assertFalse(any(
+                'COUNT(' in query['sql'] or 'MAX(' in query['sql']
+                for query in context.captured_queries
+            ))
+            body = response.json()
+            self.assertNotIn('count', body)
+            ids.extend(item['id'] for item in body['results'])
+            if not body['next']:
+                return ids, body
+            url, params = body['next'], None
+
+    def test_recipes_cursor_walk(self):
+        expected = list(
+            Recipe.objects.order_by('-id').values_list('id', flat=True)
+        )
+        for client in (self.guest_client, self.authorized_client):
+            with self.subTest(authorized=client is self.authorized_client):
+                ids, last_page = self.walk(client, '/api/recipes/', 7)
+                self.assertEqual(ids, expected)
+                previous = client.get(last_page['previous']).json()
+                self.assertEqual(len(previous['results']), 7)
+
+    def test_cursor_page_not_modified(self):
+        params = {'cursor': '', 'limit': 5}
+        response = self.authorized_client.get('/api/recipes/', params)
+        with CaptureQueriesContext(connection) as context:
+            response = self.authorized_client.get(
+                '/api/recipes/', params, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        self.assertEqual(response.status_code, HTTP_304_NOT_MODIFIED)
+        # The token lookup and the page rows.
+        self.assertEqual(len(context), 2)
+        self.authorized_client.post(
+            f'/api/recipes/{Recipe.objects.latest("id").id}/favorite/'
+        )
+        response = self.authorized_client.get(
+            '/api/recipes/', params, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, HTTP_200_OK)
+
+    def test_subscriptions_cursor_walk(self):
+        ids, _ = self.walk(
+            self.authorized_client, '/api/users/subscriptions/', 3
+        )
+        self.assertEqual(
+            ids, sorted((author.id for author in self.authors[:4]),
+                        reverse=True)
+        )
+
+    def test_page_number_format_kept(self):
+        body = self.guest_client.get('/api/recipes/', {'page': 2}).json()
+        self.assertEqual(set(body), {'count', 'next', 'previous', 'results'})
+
+    def test_limit_is_capped(self):
+        Recipe.objects.bulk_create(
+            Recipe(
+                author=self.user,
+                name=f'bulk {index}',
+                text='text',
+                cooking_time=1,
+                image='recipe_images/test.gif'
+            ) for index in range(MAX_PAGE_SIZE)
+        )
+        for params in ({'limit': 1000}, {'limit': 1000, 'cursor': ''}):
+            with self.subTest(params=params):
+                body = self.guest_client.get('/api/recipes/', params).json()
+                self.assertEqual(len(body['results']), MAX_PAGE_SIZE)
@@ -0,0 +1,226 @@
+"""SQL query budgets for every api endpoint.
+
+Budgets include the token authentication lookup and assume warm
+in-memory catalogs and membership cache but cold list counts. List
+endpoints are requested with two page sizes and must run the same
+number of queries. Recipe lists spend one aggregate query on their count
+and ETag.
+"""
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_201_CREATED,
+    HTTP_204_NO_CONTENT
+)
+
+from api.membership import get_membership
+from api.tests.base import SMALL_GIF, ApiTestCase
+from recipes.registry import tag_registry
+from recipes.versions import RECIPE_COUNTS, bump_version
+
+SMALL_PAGE = 1
+LARGE_PAGE = 16
+
+
+class QueryBudgetTest(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        tag_registry.get_data()
+        get_membership(self.user)
+
+    def assert_page_budget(self, client, path, budget, params=None):
+        """Check the budget holds and does not grow with the page size."""
+        counts = []
+        for limit in (SMALL_PAGE, LARGE_PAGE):
+            bump_version(RECIPE_COUNTS)
+            query = {**(params or {}), 'limit': limit}
+            with self.assert_max_queries(
+                budget, f'GET {path} {query}'
+            ) as context:
+                response = client.get(path, query)
+            self.assertEqual(response.status_code, HTTP_200_OK)
+            counts.append(len(context))
+        self.assertEqual(
+            counts[0],
+            counts[1],
+            f'GET {path} {params}: query count depends on page size'
+        )
+
+    def assert_budget(self, budget, method, client, path,
+                      expected_status, data=None):
+        with self.assert_max_queries(budget, f'{method.upper()} {path}'):
+            response = getattr(client, method)(path, data, format='json')
+        self.assertEqual(
+            response.status_code, expected_status, response.content
+        )
+        return response
+
+    def recipe_payload(self, **overrides):
+        payload = {
+            'ingredients': [
+                {'id': ingredient.id, 'amount': 10}
+                for ingredient in self.ingredients[:3]
+            ],
+            'tags': [tag.id for tag in self.tags[:2]],
+            'image': SMALL_GIF,
+            'name': 'New recipe',
+            'text': 'New recipe text',
+            'cooking_time': 15
+        }
+        payload.update(overrides)
+        return payload
+
+    def test_recipe_list(self):
+        self.assert_page_budget(self.guest_client, '/api/recipes/', 4)
+        self.assert_page_budget(self.authorized_client, '/api/recipes/', 5)
+
+    def test_recipe_list_filters(self):
+        filters = (
+            ({'tags': 'lunch'}, 5),
+            ({'tags': ['breakfast', 'dinner']}, 5),
+            ({'tags': ['breakfast', 'lunch'], 'tags_match': 'all'}, 5),
+            ({'author': self.authors[0].id}, 6),
+        )
+        for params, budget in filters:
+            with self.subTest(params=params):
+                self.assert_page_budget(
+                    self.authorized_client, '/api/recipes/', budget, params
+                )
+
+    def test_recipe_list_user_filters(self):
+        filters = (
+            {'is_favorited': 1},
+            {'is_in_shopping_cart': 1},
+            {'is_favorited': 1, 'is_in_shopping_cart': 1, 'tags': 'lunch'},
+        )
+        for params in filters:
+            with self.subTest(params=params):
+                self.assert_page_budget(
+                    self.authorized_client, '/api/recipes/', 5, params
+                )
+
+    def test_recipe_detail(self):
+        path = f'/api/recipes/{self.recipes[0].id}/'
+        self.assert_budget(3, 'get', self.guest_client, path, HTTP_200_OK)
+        self.assert_budget(4, 'get', self.authorized_client, path, HTTP_200_OK)
+
+    def test_recipe_create(self):
+        # One query reads subscribers to fan the recipe out to timelines.
+        self.assert_budget(
+            11,
+            'post',
+            self.authorized_client,
+            '/api/recipes/',
+            HTTP_201_CREATED,
+            self.recipe_payload()
+        )
+
+    def test_recipe_update(self):
+        self.assert_budget(
+            18,
+            'patch',
+            self.authorized_client,
+            f'/api/recipes/{self.own_recipe.id}/',
+            HTTP_200_OK,
+            self.recipe_payload(name='Updated recipe')
+        )
+
+    def test_recipe_delete(self):
+        self.assert_budget(
+            16,
+            'delete',
+            self.authorized_client,
+            f'/api/recipes/{self.own_recipe.id}/',
+            HTTP_204_NO_CONTENT
+        )
+
+    def test_favorite_toggle(self):
+        path = f'/api/recipes/{self.recipes[1].id}/favorite/'
+        self.assert_budget(
+            9, 'post', self.authorized_client, path, HTTP_201_CREATED
+        )
+        self.assert_budget(
+            5, 'delete', self.authorized_client, path, HTTP_204_NO_CONTENT
+        )
+
+    def test_shopping_cart_toggle(self):
+        # Shopping list upkeep: read, insert, update and delete in a
+        # savepoint, whatever the number of ingredients.
+        path = f'/api/recipes/{self.recipes[1].id}/shopping_cart/'
+        self.assert_budget(
+            16, 'post', self.authorized_client, path, HTTP_201_CREATED
+        )
+        self.assert_budget(
+            12, 'delete', self.authorized_client, path, HTTP_204_NO_CONTENT
+        )
+
+    def test_download_shopping_cart(self):
+        for export_format in ('txt', 'csv', 'json'):
+            with self.assert_max_queries(2, f'{export_format} export'):
+                response = self.authorized_client.get(
+                    '/api/recipes/download_shopping_cart/',
+                    {'format': export_format}
+                )
+                b''.join(response.streaming_content)
+            self.assertEqual(response.status_code, HTTP_200_OK)
+
+    def test_tags(self):
+        self.assert_budget(
+            1, 'get', self.guest_client, '/api/tags/', HTTP_200_OK
+        )
+        self.assert_budget(
+            1, 'get', self.guest_client,
+            f'/api/tags/{self.tags[0].id}/', HTTP_200_OK
+        )
+
+    def test_ingredients(self):
+        self.assert_budget(
+            1, 'get', self.guest_client,
+            '/api/ingredients/?name=ingr', HTTP_200_OK
+        )
+        self.assert_budget(
+            1, 'get', self.guest_client,
+            f'/api/ingredients/{self.ingredients[0].id}/?name=ingr',
+            HTTP_200_OK
+        )
+
+    def test_user_list(self):
+        self.assert_page_budget(self.guest_client, '/api/users/', 2)
+        self.assert_page_budget(self.authorized_client, '/api/users/', 3)
+
+    def test_user_detail(self):
+        self.assert_budget(
+            3, 'get', self.authorized_client,
+            f'/api/users/{self.authors[0].id}/', HTTP_200_OK
+        )
+        self.assert_budget(
+            1, 'get', self.authorized_client, '/api/users/me/', HTTP_200_OK
+        )
+
+    def test_subscriptions(self):
+        self.assert_page_budget(
+            self.authorized_client, '/api/users/subscriptions/', 4
+        )
+        self.assert_page_budget(
+            self.authorized_client,
+            '/api/users/subscriptions/',
+            4,
+            {'recipes_limit': 2}
+        )
+
+    def test_feed(self):
+        self.assert_page_budget(
+            self.authorized_client, '/api/recipes/feed/', 4
+        )
+
+    def test_subscribe_toggle(self):
+        path = f'/api/users/{self.authors[-1].id}/subscribe/'
+        # Timeline backfill reads the author's latest recipes and inserts
+        # them.
+        self.assert_budget(
+            9, 'post', self.authorized_client, path, HTTP_201_CREATED
+        )
+        # One more query trims the author's recipes from the timeline.
+        self.assert_budget(
+            6, 'delete', self.authorized_client, path, HTTP_204_NO_CONTENT
+        )
@@ -0,0 +1,142 @@
+"""Parity of read serializers with the ModelSerializer based ones."""
+from io import StringIO
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import call_command
+from django.db.models import Exists, OuterRef, Value
+from django.test import RequestFactory
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from api.serializers import (
+    RecipeSerializer,
+    SubscriptionListSerializer,
+    UserCustomSerializer
+)
+from api.tests.base import ApiTestCase
+from recipes.models import IngredientRecipe, Recipe
+from users.models import SubscribeUser, User
+
+
+class ReadSerializerParityTest(ApiTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        recipe = Recipe.objects.create(
+            author=cls.authors[0],
+            name='Борщ "домашний" 🍲',
+            text='Строка\nвторая',
+            cooking_time=90,
+            image='recipe_images/борщ.gif',
+            image_variants={
+                'list': {
+                    'jpeg': 'recipe_images/variants/borsch-list.jpg',
+                    'webp': 'recipe_images/variants/borsch-list.webp',
+                },
+            }
+        )
+        recipe.tags.add(cls.tags[2])
+        recipe.tags.add(cls.tags[0])
+        for ingredient in reversed(cls.ingredients[:3]):
+            IngredientRecipe.objects.create(
+                recipe=recipe, ingredient=ingredient, amount=7
+            )
+
+    def context(self, user=None):
+        request = Request(RequestFactory().get('/'))
+        request.user = user or self.user
+        return {'request': request}
+
+    def users(self, user):
+        if not user.is_authenticated:
+            return User.objects.annotate(is_subscribed=Value(False))
+        return User.objects.annotate(
+            is_subscribed=Exists(
+                SubscribeUser.objects.filter(user=user, author=OuterRef('pk'))
+            )
+        )
+
+    def assert_same_json(self, response, expected):
+        """Response body equals expected data rendered the usual way."""
+        self.assertEqual(response.status_code, 200, response.content)
+        body = response.json()
+        if isinstance(body, dict) and 'results' in body:
+            body['results'] = expected
+        else:
+            body = expected
+        self.assertEqual(response.content, JSONRenderer().render(body))
+
+    def recipes_json(self, user, recipes):
+        return RecipeSerializer(
+            recipes, many=True, context=self.context(user)
+        ).data
+
+    def test_recipe_list(self):
+        for client, user in (
+            (self.guest_client, AnonymousUser()),
+            (self.authorized_client, self.user),
+        ):
+            response = client.get('/api/recipes/', {'limit': 100})
+            self.assert_same_json(response, self.recipes_json(
+                user, Recipe.objects.for_read(user)
+            ))
+
+    def test_recipe_detail(self):
+        recipe = Recipe.objects.order_by('-id').first()
+        response = self.authorized_client.get(f'/api/recipes/{recipe.id}/')
+        self.assert_same_json(response, self.recipes_json(
+            self.user, Recipe.objects.for_read(self.user).filter(pk=recipe.pk)
+        )[0])
+
+    def test_recipe_feed(self):
+        response = self.authorized_client.get(
+            '/api/recipes/feed/', {'limit': 100}
+        )
+        self.assert_same_json(response, self.recipes_json(
+            self.user,
+            Recipe.objects.for_read(self.user).filter(
+                author__in=self.authors[:4]
+            )
+        ))
+
+    def test_user_list_and_detail(self):
+        response = self.authorized_client.get('/api/users/', {'limit': 100})
+        self.assert_same_json(response, UserCustomSerializer(
+            self.users(self.user), many=True, context=self.context()
+        ).data)
+        author = self.authors[0]
+        response = self.authorized_client.get(f'/api/users/{author.id}/')
+        self.assert_same_json(response, UserCustomSerializer(
+            self.users(self.user).get(pk=author.pk), context=self.context()
+        ).data)
+
+    def test_subscriptions(self):
+        authors = User.objects.filter(
+            subscriber_author__user=self.user
+        ).prefetch_related('recipes')
+        for limit in (None, 2):
+            params = {'recipes_limit': limit} if limit else {}
+            response = self.authorized_client.get(
+                '/api/users/subscriptions/', params
+            )
+            self.assert_same_json(response, SubscriptionListSerializer(
+                authors.all(),
+                many=True,
+                context={**self.context(), 'recipes_limit': limit}
+            ).data)
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command(
+            'benchmark_serializers',
+            user=self.user.pk,
+            repeat=1,
+            host='testserver',
+            stdout=out
+        )
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        for line in lines:
+            self.assertNotIn('DIFFERS', line)
@@ -0,0 +1,152 @@
+"""Tests for export_recipes and import_recipes commands."""
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+
+from api.tests.base import TEMP_MEDIA_ROOT, ApiTestCase
+from recipes.models import Ingredient, Recipe, Tag, TimelineEntry
+from users.models import User
+
+
+class RecipeTransferTest(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.path = os.path.join(self.directory, 'recipes.ndjson')
+
+    def export(self, *options):
+        call_command(
+            'export_recipes', self.path, *options,
+            stdout=StringIO(), stderr=StringIO()
+        )
+        with open(self.path, encoding='utf-8') as exported:
+            return [json.loads(line) for line in exported]
+
+    def write(self, records):
+        with open(self.path, 'w', encoding='utf-8') as output:
+            output.writelines(json.dumps(record) + '\n' for record in records)
+
+    def import_file(self, *options):
+        stdout = StringIO()
+        call_command('import_recipes', self.path, *options, stdout=stdout)
+        return stdout.getvalue()
+
+    def snapshot(self, recipe):
+        return (
+            recipe.author.email,
+            recipe.text,
+            recipe.cooking_time,
+            sorted(recipe.tags.values_list('slug', flat=True)),
+            sorted(recipe.ingredient_recipe.values_list(
+                'ingredient__name', 'amount'
+            )),
+        )
+
+    def test_export_records(self):
+        records = self.export('--chunk-size', '7')
+        self.assertEqual(
+            [record['id'] for record in records],
+            list(Recipe.objects.order_by('id').values_list('id', flat=True))
+        )
+        record = next(r for r in records if r['id'] == self.recipes[0].id)
+        self.assertEqual(record['author']['email'], self.authors[0].email)
+        self.assertEqual(
+            [tag['slug'] for tag in record['tags']], ['breakfast', 'lunch']
+        )
+        self.assertEqual(len(record['ingredients']), 4)
+
+    def test_export_range(self):
+        first, last = self.recipes[2].id, self.recipes[5].id
+        records = self.export('--from-id', str(first), '--to-id', str(last))
+        self.assertEqual(
+            [record['id'] for record in records],
+            list(range(first, last + 1))
+        )
+
+    def test_round_trip(self):
+        records = self.export()
+        originals = {
+            recipe.name: self.snapshot(recipe)
+            for recipe in Recipe.objects.filter(author=self.authors[1])
+        }
+        Recipe.objects.filter(author=self.authors[1]).delete()
+        output = self.import_file('--batch-size', '4')
+        self.assertIn(f'{len(originals)} recipes', output)
+        self.assertIn(f'{len(records) - len(originals)} skipped', output)
+        restored = {
+            recipe.name: self.snapshot(recipe)
+            for recipe in Recipe.objects.filter(author=self.authors[1])
+        }
+        self.assertEqual(restored, originals)
+        self.authors[1].refresh_from_db()
+        self.assertEqual(self.authors[1].recipes_count, len(originals))
+        total = Recipe.objects.count()
+        self.assertIn(f'{len(records)} skipped', self.import_file())
+        self.assertEqual(Recipe.objects.count(), total)
+
+    def test_import_fills_follower_timelines(self):
+        self.export()
+        Recipe.objects.filter(author=self.authors[1]).delete()
+        self.import_file()
+        self.assertEqual(
+            set(TimelineEntry.objects.filter(
+                user=self.user, recipe__author=self.authors[1]
+            ).values_list('recipe_id', flat=True)),
+            set(Recipe.objects.filter(
+                author=self.authors[1]
+            ).values_list('id', flat=True))
+        )
+
+    def test_remaps_missing_catalogs_and_authors(self):
+        record = self.export(
+            '--from-id', str(self.recipes[0].id),
+            '--to-id', str(self.recipes[0].id)
+        )[0]
+        record['author'] = {
+            'email': 'new@foodgram.test',
+            'username': 'newcomer',
+            'first_name': 'New',
+            'last_name': 'Comer',
+        }
+        record['tags'] = [{'name': 'Brunch', 'color': '#123456',
+                           'slug': 'brunch'}]
+        record['ingredients'] = [
+            {'name': 'saffron', 'measurement_unit': 'mg', 'amount': 2}
+        ]
+        self.write([record])
+        self.import_file()
+        self.assertFalse(User.objects.filter(username='newcomer').exists())
+        self.import_file('--create-authors')
+        author = User.objects.get(username='newcomer')
+        self.assertFalse(author.has_usable_password())
+        recipe = Recipe.objects.get(author=author)
+        self.assertEqual(list(recipe.tags.all()), [Tag.objects.get(
+            slug='brunch'
+        )])
+        ingredient = Ingredient.objects.get(name='saffron')
+        self.assertEqual(
+            list(recipe.ingredient_recipe.values_list(
+                'ingredient', 'amount'
+            )),
+            [(ingredient.id, 2)]
+        )
+
+    def test_media_tar(self):
+        self.own_recipe.image.save('own.gif', ContentFile(b'GIF89a'))
+        media = os.path.join(self.directory, 'media.tar')
+        records = self.export('--media', media)
+        self.write([r for r in records if r['id'] == self.own_recipe.id])
+        image_path = os.path.join(TEMP_MEDIA_ROOT, self.own_recipe.image.name)
+        os.remove(image_path)
+        self.own_recipe.delete()
+        self.import_file('--media', media)
+        recipe = Recipe.objects.get(author=self.user, name='viewer recipe')
+        with recipe.image.open('rb') as image:
+            self.assertEqual(image.read(), b'GIF89a')
@@ -0,0 +1,107 @@
+"""Tests for diff based recipe updates."""
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+
+from api.tests.base import ApiTestCase
+from recipes.models import IngredientRecipe, Recipe
+
+WRITES = ('INSERT', 'UPDATE', 'DELETE')
+
+
+class RecipeUpdateTest(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.recipe = self.recipes[0]
+        Recipe.objects.filter(pk=self.recipe.pk).update(author=self.user)
+        self.path = f'/api/recipes/{self.recipe.id}/'
+
+    def rows(self):
+        return dict(
+            IngredientRecipe.objects.filter(
+                recipe=self.recipe
+            ).values_list('ingredient_id', 'id')
+        )
+
+    def current_payload(self):
+        return {
+            'ingredients': [
+                {'id': ingredient_id, 'amount': amount}
+                for ingredient_id, amount in IngredientRecipe.objects.filter(
+                    recipe=self.recipe
+                ).values_list('ingredient_id', 'amount')
+            ],
+            'tags': list(self.recipe.tags.values_list('id', flat=True)),
+            'name': self.recipe.name,
+            'text': self.recipe.text,
+            'cooking_time': self.recipe.cooking_time,
+        }
+
+    def send(self, method, data):
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.authorized_client, method)(
+                self.path, data, format='json'
+            )
+        writes = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith(WRITES)
+        ]
+        return response, writes
+
+    def test_unchanged_update_writes_nothing(self):
+        updated_at = Recipe.objects.get(pk=self.recipe.pk).updated_at
+        for method in ('put', 'patch'):
+            with self.subTest(method=method):
+                response, writes = self.send(method, self.current_payload())
+                self.assertEqual(response.status_code, HTTP_200_OK)
+                self.assertEqual(writes, [])
+        self.assertEqual(
+            Recipe.objects.get(pk=self.recipe.pk).updated_at, updated_at
+        )
+
+    def test_partial_update_keeps_other_fields(self):
+        tags = set(self.recipe.tags.values_list('id', flat=True))
+        rows = self.rows()
+        response, writes = self.send('patch', {'name': 'Renamed'})
+        self.assertEqual(response.status_code, HTTP_200_OK, response.content)
+        self.assertEqual(len(writes), 1)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.name, 'Renamed')
+        self.assertEqual(
+            set(self.recipe.tags.values_list('id', flat=True)), tags
+        )
+        self.assertEqual(self.rows(), rows)
+
+    def test_put_requires_all_fields(self):
+        response, writes = self.send('put', {'name': 'Renamed'})
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+        self.assertEqual(writes, [])
+
+    def test_ingredient_diff(self):
+        rows = self.rows()
+        kept, changed, removed, *_ = rows
+        kept_amount = IngredientRecipe.objects.get(pk=rows[kept]).amount
+        added = self.ingredients[9].id
+        response, _ = self.send('patch', {
+            'ingredients': [
+                {'id': kept, 'amount': kept_amount},
+                {'id': changed, 'amount': 99},
+                {'id': added, 'amount': 5},
+            ],
+            'tags': [self.tags[2].id],
+        })
+        self.assertEqual(response.status_code, HTTP_200_OK, response.content)
+        new_rows = self.rows()
+        self.assertEqual(set(new_rows), {kept, changed, added})
+        self.assertEqual(new_rows[kept], rows[kept])
+        self.assertEqual(new_rows[changed], rows[changed])
+        self.assertEqual(
+            IngredientRecipe.objects.get(pk=rows[changed]).amount, 99
+        )
+        self.assertNotIn(removed, new_rows)
+        self.assertEqual(
+            list(self.recipe.tags.values_list('id', flat=True)),
+            [self.tags[2].id]
+        )
@@ -0,0 +1,60 @@
+"""Tests for batched recipe payload validation."""
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework.status import HTTP_201_CREATED, HTTP_400_BAD_REQUEST
+
+from api.tests.base import SMALL_GIF, ApiTestCase
+from recipes.models import Recipe
+
+
+class RecipeValidationTest(ApiTestCase):
+
+    def payload(self, ingredients, tags=None):
+        return {
+            'ingredients': [
+                {'id': pk, 'amount': 2} for pk in ingredients
+            ],
+            'tags': tags or [self.tags[0].id],
+            'image': SMALL_GIF,
+            'name': f'validated {len(ingredients)}',
+            'text': 'text',
+            'cooking_time': 5,
+        }
+
+    def post(self, payload):
+        with CaptureQueriesContext(connection) as context:
+            response = self.authorized_client.post(
+                '/api/recipes/', payload, format='json'
+            )
+        return response, len(context)
+
+    def test_missing_and_duplicate_ingredients(self):
+        known = self.ingredients[0].id
+        response, _ = self.post(self.payload([known, 0, known]))
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+        errors = response.json()['ingredients']
+        self.assertEqual(errors[0], {})
+        self.assertIn('does not exist', errors[1]['id'][0])
+        self.assertIn('Duplicate', errors[2]['id'][0])
+        self.assertFalse(Recipe.objects.filter(author=self.user).exclude(
+            pk=self.own_recipe.pk
+        ).exists())
+
+    def test_duplicate_tags(self):
+        tag = self.tags[0].id
+        response, _ = self.post(
+            self.payload([self.ingredients[0].id], [tag, tag])
+        )
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+        self.assertIn('Duplicate', response.json()['tags']['1'][0])
+
+    def test_validation_cost_is_constant(self):
+        # The first request warms the tag registry and membership cache.
+        counts = []
+        for size in (1, 1, len(self.ingredients)):
+            ingredients = [item.id for item in self.ingredients[:size]]
+            response, queries = self.post(self.payload(ingredients))
+            self.assertEqual(response.status_code, HTTP_201_CREATED)
+            counts.append(queries)
+        self.assertEqual(counts[1], counts[2])
@@ -0,0 +1,104 @@
+"""Tests for the anonymous recipe response cache."""
+import shutil
+import tempfile
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework.status import HTTP_200_OK, HTTP_304_NOT_MODIFIED
+
+from api.response_cache import CACHE_HEADER
+from api.tests.base import ApiTestCase
+from recipes.models import Recipe
+
+
+class ResponseCacheTest(ApiTestCase):
+
+    def get(self, client, path='/api/recipes/', params=None, **headers):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(path, params, **headers)
+        return response, len(context)
+
+    def assert_hit(self, path='/api/recipes/', params=None):
+        first, _ = self.get(self.guest_client, path, params)
+        self.assertEqual(first.status_code, HTTP_200_OK)
+        self.assertEqual(first[CACHE_HEADER], 'MISS')
+        second, queries = self.get(self.guest_client, path, params)
+        self.assertEqual(second[CACHE_HEADER], 'HIT')
+        self.assertEqual(queries, 0)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(second['Content-Type'], first['Content-Type'])
+        return second
+
+    def test_list_and_detail_hit(self):
+        self.assert_hit(params={'tags': 'lunch', 'limit': 3})
+        self.assert_hit(f'/api/recipes/{self.recipes[0].id}/')
+
+    def test_params_normalized(self):
+        self.assert_hit(params={'limit': 3, 'tags': ['lunch', 'dinner']})
+        response, _ = self.get(
+            self.guest_client,
+            '/api/recipes/?tags=dinner&tags=lunch&limit=3'
+        )
+        self.assertEqual(response[CACHE_HEADER], 'HIT')
+        response, _ = self.get(self.guest_client, params={'limit': 4})
+        self.assertEqual(response[CACHE_HEADER], 'MISS')
+
+    def test_authorized_not_cached(self):
+        for _ in range(2):
+            response, _ = self.get(self.authorized_client)
+            self.assertEqual(response.status_code, HTTP_200_OK)
+            self.assertNotIn(CACHE_HEADER, response)
+
+    def test_browsable_api_not_cached(self):
+        for _ in range(2):
+            response, _ = self.get(self.guest_client, params={'format': 'api'})
+            self.assertEqual(response.status_code, HTTP_200_OK)
+            self.assertNotIn(CACHE_HEADER, response)
+
+    @override_settings(ALLOWED_HOSTS=['testserver', 'mirror.test'])
+    def test_keyed_by_host_and_scheme(self):
+        self.assert_hit()
+        for headers in (
+            {'HTTP_HOST': 'mirror.test'},
+            {'wsgi.url_scheme': 'https'},
+        ):
+            with self.subTest(headers=headers):
+                response, _ = self.get(self.guest_client, **headers)
+                self.assertEqual(response[CACHE_HEADER], 'MISS')
+
+    def test_hit_answers_conditional_get(self):
+        etag = self.assert_hit()['ETag']
+        response, queries = self.get(
+            self.guest_client, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, HTTP_304_NOT_MODIFIED)
+        self.assertEqual(queries, 0)
+
+    def test_writes_invalidate(self):
+        recipe = Recipe.objects.get(pk=self.recipes[0].pk)
+        writes = (
+            recipe.save,
+            lambda: self.authorized_client.post(
+                f'/api/recipes/{self.recipes[1].id}/favorite/'
+            ),
+            self.tags[0].save,
+        )
+        self.assert_hit()
+        for write in writes:
+            write()
+            response, _ = self.get(self.guest_client)
+            self.assertEqual(response[CACHE_HEADER], 'MISS')
+            response, _ = self.get(self.guest_client)
+            self.assertEqual(response[CACHE_HEADER], 'HIT')
+
+    def test_file_backend(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        backend = 'django.core.cache.backends.filebased.FileBasedCache'
+        with override_settings(CACHES={
+            'default': {'BACKEND': backend, 'LOCATION': location}
+        }):
+            self.assert_hit()
@@ -0,0 +1,140 @@
+"""Tests for the shopping list export."""
+import csv
+import io
+import json
+
+from django.core.management import call_command
+
+from rest_framework.status import HTTP_200_OK, HTTP_401_UNAUTHORIZED
+
+from api.tests.base import SMALL_GIF, ApiTestCase
+from recipes import shopping_list
+from recipes.models import (
+    IngredientRecipe,
+    Recipe,
+    ShoppingCart,
+    ShoppingListItem
+)
+
+URL = '/api/recipes/download_shopping_cart/'
+
+
+class ShoppingListTest(ApiTestCase):
+
+    def expected_rows(self):
+        totals = {}
+        for item in IngredientRecipe.objects.filter(
+            recipe__in_shopping_cart__user=self.user
+        ).select_related('ingredient'):
+            key = (item.ingredient.name, item.ingredient.measurement_unit)
+            totals[key] = totals.get(key, 0) + item.amount
+        return [
+            {'name': name, 'measurement_unit': unit, 'amount': amount}
+            for (name, unit), amount in sorted(totals.items())
+        ]
+
+    def download(self, export_format):
+        response = self.authorized_client.get(URL, {'format': export_format})
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertIn(
+            f'filename="shopping_list.{export_format}"',
+            response['Content-Disposition']
+        )
+        self.assertIn('charset=utf-8', response['Content-Type'])
+        return b''.join(response.streaming_content).decode()
+
+    def test_txt(self):
+        lines = self.download('txt').splitlines()
+        self.assertEqual(lines, [
+            f'{row["name"]} ({row["measurement_unit"]}) - {row["amount"]}'
+            for row in self.expected_rows()
+        ])
+
+    def test_csv(self):
+        rows = list(csv.DictReader(io.StringIO(self.download('csv'))))
+        self.assertEqual(rows, [
+            {key: str(value) for key, value in row.items()}
+            for row in self.expected_rows()
+        ])
+
+    def test_json(self):
+        self.assertEqual(
+            json.loads(self.download('json')), self.expected_rows()
+        )
+
+    def test_empty_cart(self):
+        self.user.shopping_cart.all().delete()
+        self.assertEqual(json.loads(self.download('json')), [])
+
+    def test_anonymous(self):
+        response = self.guest_client.get(URL)
+        self.assertEqual(response.status_code, HTTP_401_UNAUTHORIZED)
+
+
+class ShoppingListMaintenanceTest(ApiTestCase):
+
+    def assert_consistent(self):
+        self.assertEqual(
+            shopping_list.stored_totals(), shopping_list.source_totals()
+        )
+
+    def test_cart_toggle(self):
+        path = f'/api/recipes/{self.recipes[1].id}/shopping_cart/'
+        self.authorized_client.post(path)
+        self.assert_consistent()
+        self.authorized_client.delete(path)
+        self.assert_consistent()
+
+    def test_recipe_update_in_carts(self):
+        ShoppingCart.objects.create(user=self.authors[0], recipe=self.own_recipe)
+        self.authorized_client.post(
+            f'/api/recipes/{self.own_recipe.id}/shopping_cart/'
+        )
+        self.authorized_client.patch(
+            f'/api/recipes/{self.own_recipe.id}/',
+            {
+                'ingredients': [
+                    {'id': self.ingredients[0].id, 'amount': 7},
+                    {'id': self.ingredients[9].id, 'amount': 3},
+                ],
+                'tags': [self.tags[0].id],
+                'image': SMALL_GIF,
+                'name': 'Updated',
+                'text': 'Updated',
+                'cooking_time': 5
+            },
+            format='json'
+        )
+        self.assert_consistent()
+
+    def test_row_inserted_concurrently(self):
+        user = self.authors[-1]
+        recipe = self.recipes[1]
+        # Another cart write has just inserted the row of one ingredient.
+        ShoppingListItem.objects.create(
+            user=user,
+            ingredient_id=recipe.ingredient_recipe.first().ingredient_id,
+            total_amount=0
+        )
+        ShoppingCart.objects.create(user=user, recipe=recipe)
+        self.assert_consistent()
+
+    def test_recipe_delete(self):
+        self.authorized_client.delete(f'/api/recipes/{self.own_recipe.id}/')
+        Recipe.objects.filter(pk=self.recipes[0].pk).delete()
+        self.assert_consistent()
+
+    def test_author_delete(self):
+        self.authors[0].delete()
+        self.assert_consistent()
+
+    def test_check_and_rebuild_command(self):
+        self.user.shopping_list.all().delete()
+        output = io.StringIO()
+        call_command('rebuild_shopping_lists', '--check', stdout=output)
+        self.assertIn(f'user {self.user.id} ingredient', output.getvalue())
+        call_command(
+            'rebuild_shopping_lists', '--user', self.user.id, stdout=output
+        )
+        self.assert_consistent()
@@ -0,0 +1,62 @@
+"""Tests for subscriptions with per-author recipe limits."""
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.tests.base import AUTHORS, RECIPES_PER_AUTHOR, ApiTestCase
+from recipes.models import Recipe
+
+
+class SubscriptionRecipesTest(ApiTestCase):
+
+    def get(self, params=''):
+        with CaptureQueriesContext(connection) as context:
+            response = self.authorized_client.get(
+                f'/api/users/subscriptions/{params}'
+            )
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results'], context
+
+    def test_newest_recipes_per_author(self):
+        results, context = self.get('?recipes_limit=2')
+        self.assertEqual(len(results), 4)
+        for author in results:
+            expected = list(Recipe.objects.filter(
+                author_id=author['id']
+            ).order_by('-id').values_list('id', flat=True)[:2])
+            self.assertEqual(
+                [recipe['id'] for recipe in author['recipes']], expected
+            )
+            self.assertEqual(author['recipes_count'], RECIPES_PER_AUTHOR)
+        self.assertTrue(any(
+            'ROW_NUMBER' in query['sql'].upper()
+            for query in context.captured_queries
+        ))
+
+    def test_limit_above_recipe_count(self):
+        results, _ = self.get(f'?recipes_limit={RECIPES_PER_AUTHOR * 2}')
+        for author in results:
+            self.assertEqual(len(author['recipes']), RECIPES_PER_AUTHOR)
+
+    def test_invalid_limit_is_ignored(self):
+        for value in ('abc', '0', '-1'):
+            results, context = self.get(f'?recipes_limit={value}')
+            for author in results:
+                self.assertEqual(len(author['recipes']), RECIPES_PER_AUTHOR)
+            self.assertFalse(any(
+                'ROW_NUMBER' in query['sql'].upper()
+                for query in context.captured_queries
+            ))
+
+    def test_top_per_author(self):
+        author_ids = [author.id for author in self.authors]
+        recipes = Recipe.objects.top_per_author(author_ids, 3)
+        self.assertEqual(recipes.count(), AUTHORS * 3)
+        self.assertEqual(
+            set(recipes.values_list('id', flat=True)),
+            {
+                pk for author in self.authors
+                for pk in Recipe.objects.filter(
+                    author=author
+                ).order_by('-id').values_list('id', flat=True)[:3]
+            }
+        )
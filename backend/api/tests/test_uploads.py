@@ -0,0 +1,123 @@
+"""Tests for multipart recipe image uploads."""
+import base64
+import json
+from io import BytesIO
+from unittest import mock
+
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.test import override_settings
+
+from rest_framework.status import (
+    HTTP_200_OK,
+    HTTP_201_CREATED,
+    HTTP_400_BAD_REQUEST
+)
+
+from PIL import Image
+
+from api.serializers import RecipeImageField
+from api.tests.base import ApiTestCase
+from recipes.models import Recipe
+
+
+def png_file(size=(20, 10), name='photo.png'):
+    content = BytesIO()
+    Image.new('RGB', size, 'orange').save(content, 'PNG')
+    content.name = name
+    content.seek(0)
+    return content
+
+
+@override_settings(IMAGE_VARIANTS_ASYNC=False)
+class MultipartUploadTest(ApiTestCase):
+
+    def form(self, **overrides):
+        return {
+            'ingredients': json.dumps(
+                [{'id': self.ingredients[0].id, 'amount': 5}]
+            ),
+            'tags': [tag.id for tag in self.tags[:2]],
+            'image': png_file(),
+            'name': 'uploaded',
+            'text': 'text',
+            'cooking_time': 3,
+            **overrides,
+        }
+
+    def post(self, data):
+        return self.authorized_client.post(
+            '/api/recipes/', data, format='multipart'
+        )
+
+    def test_create_with_file(self):
+        seen = []
+        to_internal_value = RecipeImageField.to_internal_value
+
+        def spy(field, data):
+            seen.append(type(data))
+            return to_internal_value(field, data)
+
+        with mock.patch.object(RecipeImageField, 'to_internal_value', spy):
+            response = self.post(self.form())
+        self.assertEqual(response.status_code, HTTP_201_CREATED,
+                         response.content)
+        self.assertEqual(seen, [TemporaryUploadedFile])
+        body = response.json()
+        self.assertEqual([tag['id'] for tag in body['tags']],
+                         [tag.id for tag in self.tags[:2]])
+        self.assertEqual(body['ingredients'][0]['amount'], 5)
+        recipe = Recipe.objects.get(pk=body['id'])
+        self.assertTrue(recipe.image.name.endswith('.png'))
+
+    def test_partial_update_with_file(self):
+        response = self.authorized_client.patch(
+            f'/api/recipes/{self.own_recipe.id}/',
+            self.form(),
+            format='multipart'
+        )
+        self.assertEqual(response.status_code, HTTP_200_OK, response.content)
+        self.own_recipe.refresh_from_db()
+        self.assertTrue(self.own_recipe.image.name.endswith('.png'))
+
+    def test_invalid_ingredients_json(self):
+        response = self.post(self.form(ingredients='[{'))
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+        self.assertIn('ingredients', response.json())
+
+    def test_not_an_image(self):
+        text = BytesIO(b'not an image')
+        text.name = 'photo.png'
+        response = self.post(self.form(image=text))
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+        self.assertIn('image', response.json())
+
+    @override_settings(RECIPE_IMAGE_MAX_SIZE=100)
+    def test_file_too_large(self):
+        response = self.post(self.form(image=png_file((200, 200))))
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+        self.assertIn('larger than 100 bytes', response.json()['image'][0])
+        self.assertFalse(Recipe.objects.filter(name='uploaded').exists())
+
+    @override_settings(RECIPE_IMAGE_MAX_PIXELS=100)
+    def test_too_many_pixels(self):
+        form = self.form()
+        with mock.patch.object(Image.Image, 'load') as load:
+            response = self.post(form)
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+        self.assertIn('more than 100 pixels', response.json()['image'][0])
+        load.assert_not_called()
+
+    @override_settings(RECIPE_IMAGE_MAX_SIZE=100)
+    def test_base64_too_large(self):
+        encoded = base64.b64encode(png_file((200, 200)).read()).decode()
+        response = self.authorized_client.post(
+            '/api/recipes/',
+            {
+                **self.form(),
+                'ingredients': [{'id': self.ingredients[0].id, 'amount': 5}],
+                'image': f'data:image/png;base64,{encoded}',
+            },
+            format='json'
+        )
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+        self.assertIn('larger than 100 bytes', response.json()['image'][0])
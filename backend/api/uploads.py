@@ -0,0 +1,44 @@
+"""Streaming recipe image uploads with size and pixel limits."""
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+from rest_framework.exceptions import ValidationError
+
+from PIL import Image
+
+TOO_LARGE_ERROR = 'Image is larger than {max_size} bytes.'
+TOO_MANY_PIXELS_ERROR = 'Image has more than {max_pixels} pixels.'
+
+
+class LimitedUploadHandler(TemporaryFileUploadHandler):
+    """Write every uploaded file to a temporary file.
+
+    Reading stops with a validation error as soon as a file grows past
+    RECIPE_IMAGE_MAX_SIZE, so oversized uploads never hit the disk fully.
+    """
+
+    def receive_data_chunk(self, raw_data, start):
+        limit = settings.RECIPE_IMAGE_MAX_SIZE
+        if start + len(raw_data) > limit:
+            self.file.close()
+            raise ValidationError(
+                {self.field_name: [TOO_LARGE_ERROR.format(max_size=limit)]}
+            )
+        return super().receive_data_chunk(raw_data, start)
+
+
+def image_pixels(image_file):
+    """Width times height read from the image header, None if unreadable.
+
+    Only the header is parsed, the bitmap is never decoded.
+    """
+    try:
+        with Image.open(image_file) as image:
+            width, height = image.size
+    except Image.DecompressionBombError:
+        return float('inf')
+    except (OSError, ValueError, SyntaxError):
+        return None
+    finally:
+        image_file.seek(0)
+    return width * height
@@ -1,9 +1,10 @@
 """Api view module."""
-from django.db.models import Sum
-from django.http.response import HttpResponse
-from django.shortcuts import get_object_or_404
+import hashlib
+
+from django.db.models import Exists, OuterRef, Value
 
 from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.status import (
@@ -16,29 +17,50 @@ from rest_framework.viewsets import ModelViewSet
 
 from djoser.views import UserViewSet
 
+from api.catalog import get_snapshot, snapshot_response
+from api.conditional import (
+    add_etag,
+    detail_etag,
+    etag_versions,
+    list_etag,
+    not_modified,
+    page_etag,
+    row_etag
+)
+from api.membership import get_request_membership
 from api.permissions import IsOwnerOrReadOnly
+from api.read_serializers import (
+    recipe_values,
+    recipes_data,
+    subscription_values,
+    subscriptions_data,
+    user_values,
+    users_data
+)
+from api.renderers import CSVRenderer, ORJSONRenderer, PlainTextRenderer
+from api.response_cache import cache_response, cached_response, response_key
 from api.serializers import (
     FavoritesSerializer,
     IngredientSerializer,
     RecipeModifySerializer,
     RecipeSerializer,
     ShoppingCartSerializer,
-    SubscriptionListSerializer,
     SubscriptionSerializer,
     TagSerializer
 )
+from api.shopping_list import shopping_list_response, shopping_list_rows
+from api.uploads import LimitedUploadHandler
+from recipes.autocomplete import ingredient_index
+from recipes.counts import get_list_stats
 from recipes.filters import RecipeFilter
-from recipes.models import (
-    FavoriteRecipe,
-    Ingredient,
-    IngredientRecipe,
-    Recipe,
-    ShoppingCart,
-    Tag
-)
-from recipes.pagination import LimitedPagination
+from recipes.models import FavoriteRecipe, Ingredient, Recipe, ShoppingCart, Tag
+from recipes.pagination import KeysetPagination, LimitedPagination
+from recipes.timeline import feed_recipes
+from recipes.versions import INGREDIENTS, TAGS
 from users.models import SubscribeUser, User
 
+COUNT_IGNORED_PARAMS = ('page', 'limit', 'cursor', 'format')
+
 
 class RecipeView(ModelViewSet):
     """Recepies View"""
@@ -49,11 +71,110 @@ class RecipeView(ModelViewSet):
     serializer_class = RecipeSerializer
     permission_classes = [IsOwnerOrReadOnly, ]
 
+    def initialize_request(self, request, *args, **kwargs):
+        request.upload_handlers = [LimitedUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # list() annotates the filtered queryset itself, after reading
+        # its stats from the bare one.
+        if self.request.method in SAFE_METHODS and self.action != 'list':
+            return queryset.for_read(self.request.user)
+        return queryset
+
     def get_serializer_class(self):
         if self.request.method in SAFE_METHODS:
             return RecipeSerializer
         return RecipeModifySerializer
 
+    def get_count_key(self):
+        """Normalized filter parameters the list count depends on.
+
+        Favorited and cart filters also depend on the viewer's membership.
+        """
+        params = self.request.query_params
+        parts = [
+            (name, sorted(params.getlist(name)))
+            for name in sorted(params)
+            if name not in COUNT_IGNORED_PARAMS
+        ]
+        if any(name in params for name in RecipeFilter.USER_FILTERS):
+            membership = get_request_membership(self.request)
+            parts.append(membership.digest() if membership else 'anonymous')
+        return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+    def get_list_stats(self, queryset):
+        """Cached ListStats of the filtered list, read once per request."""
+        if not hasattr(self, 'stats'):
+            self.stats = get_list_stats(queryset, self.get_count_key())
+        return self.stats
+
+    def get_count(self, queryset):
+        """(count, approximate) of the filtered list for the paginator."""
+        stats = self.get_list_stats(queryset)
+        return stats.count, stats.approximate
+
+    def list(self, request, *args, **kwargs):
+        key = response_key(request)
+        response = cached_response(request, key)
+        if response:
+            return response
+        recipes = self.filter_queryset(self.get_queryset())
+        queryset = recipe_values(recipes.for_read(request.user))
+        if self.paginator.is_keyset(request):
+            # Keyset pages need no COUNT, their rows make up the ETag.
+            page = self.paginate_queryset(queryset)
+            etag = page_etag(
+                page,
+                self.paginator.keyset.has_next,
+                self.paginator.keyset.has_previous
+            )
+        else:
+            page = None
+            stats = self.get_list_stats(recipes)
+            etag = list_etag(request, stats, etag_versions())
+        response = not_modified(request, etag)
+        if response:
+            return response
+        if page is None:
+            page = self.paginate_queryset(queryset)
+        return cache_response(
+            add_etag(
+                self.get_paginated_response(recipes_data(page, request)),
+                etag
+            ),
+            key,
+            etag
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        key = response_key(request)
+        response = cached_response(request, key)
+        if response:
+            return response
+        if 'HTTP_IF_NONE_MATCH' in request.META:
+            response = not_modified(
+                request, detail_etag(request, kwargs[self.lookup_field])
+            )
+            if response:
+                return response
+        row = get_object_or_404(
+            recipe_values(self.filter_queryset(self.get_queryset())),
+            pk=kwargs[self.lookup_field]
+        )
+        self.check_object_permissions(request, row)
+        etag = row_etag(row, etag_versions())
+        return cache_response(
+            add_etag(Response(recipes_data([row], request)[0]), etag),
+            key,
+            etag
+        )
+
+    def get_read_instance(self, instance):
+        """Reload a saved recipe with annotations for the response."""
+        return Recipe.objects.for_read(self.request.user).get(pk=instance.pk)
+
     def perform_create(self, serializer):
         """Create new recipe."""
         serializer.save(
@@ -65,7 +186,7 @@ class RecipeView(ModelViewSet):
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
         serializer = RecipeSerializer(
-            instance=serializer.instance,
+            instance=self.get_read_instance(serializer.instance),
             context={'request': self.request}
         )
         headers = self.get_success_headers(serializer.data)
@@ -79,12 +200,13 @@ class RecipeView(ModelViewSet):
         instance = self.get_object()
         serializer = self.get_serializer(
             instance,
-            data=request.data
+            data=request.data,
+            partial=kwargs.pop('partial', False)
         )
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
         serializer = RecipeSerializer(
-            instance=serializer.instance,
+            instance=self.get_read_instance(serializer.instance),
             context={'request': self.request}
         )
         return Response(
@@ -148,30 +270,29 @@ class RecipeView(ModelViewSet):
 
     @action(
         methods=['get', ],
-        detail=False
+        detail=False,
+        permission_classes=(IsAuthenticated, ),
+        pagination_class=KeysetPagination
     )
-    def download_shopping_cart(self, request, pk=None):
-        user = request.user
-
-        ingredients = IngredientRecipe.objects.filter(
-            recipe__in_shopping_cart__user=user
-        ).order_by(
-            'ingredient__name'
-        ).values(
-            'ingredient__name',
-            'ingredient__measurement_unit'
-        ).annotate(sum_amount=Sum('amount'))
-
-        shopping_cart = '\n'.join([
-            f'{ingredient["ingredient__name"]}'
-            f'({ingredient["ingredient__measurement_unit"]})'
-            f' - {ingredient["sum_amount"]} '
-            for ingredient in ingredients
-        ])
+    def feed(self, request):
+        """Recipes of followed authors, newest first."""
+        queryset = feed_recipes(
+            request.user, self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(recipe_values(queryset))
+        return self.get_paginated_response(recipes_data(page, request))
 
-        content = HttpResponse(shopping_cart, 'Content-Type: text/plain,charset=utf8')
-        content['Content-Disposition'] = 'attachment;filename="shopping_list.txt"'
-        return content
+    @action(
+        methods=['get', ],
+        detail=False,
+        permission_classes=(IsAuthenticated, ),
+        renderer_classes=(PlainTextRenderer, CSVRenderer, ORJSONRenderer)
+    )
+    def download_shopping_cart(self, request, pk=None):
+        return shopping_list_response(
+            shopping_list_rows(request.user),
+            request.accepted_renderer.format
+        )
 
 
 class TagView(ModelViewSet):
@@ -180,20 +301,65 @@ class TagView(ModelViewSet):
     serializer_class = TagSerializer
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        return snapshot_response(request, get_snapshot(
+            TAGS,
+            lambda: self.get_serializer(self.get_queryset(), many=True).data
+        ))
+
 
 class IngridientView(ModelViewSet):
     """Ingredient View"""
+    queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     pagination_class = None
 
-    def get_queryset(self):
-        query = self.request.GET.get('name')
-        return Ingredient.objects.filter(name__startswith=query)
+    def list(self, request, *args, **kwargs):
+        query = request.query_params.get('name')
+        if query is None:
+            return snapshot_response(request, get_snapshot(
+                INGREDIENTS,
+                lambda: self.get_serializer(
+                    self.get_queryset(), many=True
+                ).data
+            ))
+        return Response(ingredient_index.search(query))
 
 
 class UserView(UserViewSet):
     pagination_class = LimitedPagination
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if user.is_authenticated:
+            return queryset.annotate(
+                is_subscribed=Exists(
+                    SubscribeUser.objects.filter(
+                        user=user,
+                        author=OuterRef('pk')
+                    )
+                )
+            )
+        return queryset.annotate(is_subscribed=Value(False))
+
+    def list(self, request, *args, **kwargs):
+        queryset = user_values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(users_data(page))
+        return Response(users_data(queryset))
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.action == 'me':
+            return super().retrieve(request, *args, **kwargs)
+        row = get_object_or_404(
+            user_values(self.filter_queryset(self.get_queryset())),
+            pk=kwargs[self.lookup_field]
+        )
+        self.check_object_permissions(request, row)
+        return Response(users_data([row])[0])
+
     @action(
         methods=['post', 'delete'],
         detail=True,
@@ -225,10 +391,13 @@ class UserView(UserViewSet):
                 return Response(data, status=HTTP_404_NOT_FOUND)
             return Response(status=HTTP_204_NO_CONTENT)
 
-    def get_subscribtion_serializer(self, *args, **kwargs):
-        kwargs.setdefault('context', self.get_serializer_context())
-        kwargs['context']['recipes_limit'] = self.request.query_params.get('recipes_limit')
-        return SubscriptionListSerializer(*args, **kwargs)
+    def get_recipes_limit(self):
+        """Positive ?recipes_limit= value, None when missing or invalid."""
+        try:
+            limit = int(self.request.query_params['recipes_limit'])
+        except (KeyError, ValueError):
+            return None
+        return limit if limit > 0 else None
 
     @action(
         methods=['get'],
@@ -236,13 +405,15 @@ class UserView(UserViewSet):
         permission_classes=[IsAuthenticated, ]
     )
     def subscriptions(self, request):
-        user = request.user
-        queryset = User.objects.filter(
-            subscriber_author__user=user
+        queryset = subscription_values(
+            User.objects.filter(subscriber_author__user=request.user)
         )
+        limit = self.get_recipes_limit()
         page = self.paginate_queryset(queryset)
-        if page:
-            serializer = self.get_subscribtion_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        serializer = self.get_subscribtion_serializer(queryset, many=True)
-        return Response(serializer.data, status=HTTP_200_OK)
+        if page is not None:
+            return self.get_paginated_response(
+                subscriptions_data(page, limit)
+            )
+        return Response(
+            subscriptions_data(queryset, limit), status=HTTP_200_OK
+        )
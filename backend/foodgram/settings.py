@@ -80,6 +80,13 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'foodgram.wsgi.application'
+ASGI_APPLICATION = 'foodgram.asgi.application'
+
+# 'asgi' runs gunicorn with uvicorn workers (see gunicorn.conf.py) and
+# serves recipe, tag, ingredient and subscription reads from the async
+# views of api.async_views.
+SERVER_MODE = os.getenv('SERVER_MODE', 'wsgi')
+ASYNC_READS = SERVER_MODE == 'asgi'
 
 
 # Database
@@ -103,6 +110,24 @@ if DEBUG:
         }
     }
 
+# Catalog versions, memberships, counts and cached responses must be seen
+# by every web worker and by management commands run as separate
+# processes, so the cache is shared.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.redis.RedisCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'redis://redis:6379/0'),
+    }
+}
+if DEBUG:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -136,6 +161,18 @@ STATIC_ROOT = os.path.join(BASE_DIR, STATIC_URL)
 MEDIA_URL = 'media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, MEDIA_URL)
 
+# Recipe image thumbnails are built by a pool of this many threads;
+# with IMAGE_VARIANTS_ASYNC off they are built inside the request.
+IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', 2))
+IMAGE_VARIANTS_ASYNC = os.getenv('IMAGE_VARIANTS_ASYNC', 'True') == 'True'
+# Recipe image uploads above these limits are refused before decoding.
+RECIPE_IMAGE_MAX_SIZE = int(
+    os.getenv('RECIPE_IMAGE_MAX_SIZE', 10 * 1024 * 1024)
+)
+RECIPE_IMAGE_MAX_PIXELS = int(
+    os.getenv('RECIPE_IMAGE_MAX_PIXELS', 40_000_000)
+)
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'users.User'
@@ -146,10 +183,37 @@ REST_FRAMEWORK = {
         'rest_framework.authentication.TokenAuthentication',
     ),
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'api.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 6,
 }
 
+# Seconds to keep exact recipe list counts per filter combination.
+RECIPE_COUNT_TIMEOUT = int(os.getenv('RECIPE_COUNT_TIMEOUT', 60))
+# Above this many recipes PostgreSQL planner estimates replace COUNT(*).
+RECIPE_COUNT_ESTIMATE_THRESHOLD = int(
+    os.getenv('RECIPE_COUNT_ESTIMATE_THRESHOLD', 100000)
+)
+# Recipes of authors with more subscribers are merged into feeds at read
+# time instead of being copied into every subscriber's timeline.
+FEED_FANOUT_MAX_SUBSCRIBERS = int(
+    os.getenv('FEED_FANOUT_MAX_SUBSCRIBERS', 1000)
+)
+# Latest recipes of an author copied into a timeline on subscription.
+FEED_BACKFILL_SIZE = int(os.getenv('FEED_BACKFILL_SIZE', 200))
+# Seconds to keep rendered recipe pages served to anonymous visitors.
+RECIPE_RESPONSE_CACHE_TIMEOUT = int(
+    os.getenv('RECIPE_RESPONSE_CACHE_TIMEOUT', 300)
+)
+
 
 DJOSER = {
     'HIDE_USERS': False,
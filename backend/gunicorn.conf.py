@@ -0,0 +1,10 @@
+"""Gunicorn settings, SERVER_MODE=asgi serves foodgram.asgi with uvicorn."""
+import os
+
+bind = '0:8000'
+
+if os.getenv('SERVER_MODE', 'wsgi') == 'asgi':
+    wsgi_app = 'foodgram.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'foodgram.wsgi:application'
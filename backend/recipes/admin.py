@@ -34,7 +34,7 @@ class RecipeAdmin(admin.ModelAdmin):
         'author',
         'text',
         'cooking_time',
-        '_favorites_count'
+        'favorites_count'
     )
     search_fields = (
         'name',
@@ -0,0 +1,62 @@
+"""In-memory ingredient name autocomplete."""
+from bisect import bisect_left
+
+from recipes.models import Ingredient
+from recipes.versions import INGREDIENTS, VersionedData
+
+SEARCH_LIMIT = 50
+
+
+class IngredientIndex(VersionedData):
+    """Sorted array of casefolded ingredient names searched with bisect.
+
+    Built from the database on first use and rebuilt when the ingredient
+    catalog version changes, so lookups never touch the database.
+    """
+
+    catalog = INGREDIENTS
+
+    def build(self):
+        rows = sorted(
+            (name.casefold(), pk, name, measurement_unit)
+            for pk, name, measurement_unit in Ingredient.objects.values_list(
+                'id', 'name', 'measurement_unit'
+            ).iterator()
+        )
+        keys = [row[0] for row in rows]
+        items = [
+            {'id': pk, 'name': name, 'measurement_unit': measurement_unit}
+            for _, pk, name, measurement_unit in rows
+        ]
+        return keys, items
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """Return prefix matches first, then substring matches."""
+        return self.search_in(self.get_data(), query, limit)
+
+    async def asearch(self, query, limit=SEARCH_LIMIT):
+        """search() for async views."""
+        return self.search_in(await self.aget_data(), query, limit)
+
+    @staticmethod
+    def search_in(data, query, limit):
+        keys, items = data
+        query = query.casefold()
+        if not query:
+            return items[:limit]
+        start = bisect_left(keys, query)
+        end = start
+        while end < len(keys) and keys[end].startswith(query):
+            end += 1
+        found = items[start:min(end, start + limit)]
+        if len(found) < limit:
+            for index, key in enumerate(keys):
+                if start <= index < end or query not in key:
+                    continue
+                found.append(items[index])
+                if len(found) == limit:
+                    break
+        return found
+
+
+ingredient_index = IngredientIndex()
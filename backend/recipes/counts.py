@@ -0,0 +1,117 @@
+"""Cached and estimated row counts for paginated recipe queries."""
+import json
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Count, Max
+
+from asgiref.sync import sync_to_async
+
+from recipes.versions import RECIPE_COUNTS, aget_version, get_version
+
+STATS_KEY = 'recipe-list-stats:{}:{}'
+
+# Row count, whether it is a planner estimate, and newest updated_at.
+ListStats = namedtuple('ListStats', ['count', 'approximate', 'last_modified'])
+
+
+def table_estimate(model, using):
+    """Planner row estimate of the whole table, None if unknown."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples FROM pg_class WHERE relname = %s',
+            [model._meta.db_table]
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def query_estimate(queryset):
+    """Planner row estimate of a query from EXPLAIN."""
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def estimate_count(queryset):
+    """Return planner estimate for big PostgreSQL tables, else None."""
+    if connections[queryset.db].vendor != 'postgresql':
+        return None
+    total = table_estimate(queryset.model, queryset.db)
+    if total is None or total < settings.RECIPE_COUNT_ESTIMATE_THRESHOLD:
+        return None
+    return query_estimate(queryset)
+
+
+def stats_aggregates(estimate):
+    aggregates = {'last_modified': Max('updated_at')}
+    if estimate is None:
+        aggregates['count'] = Count('pk')
+    return aggregates
+
+
+def make_stats(values, estimate):
+    if estimate is None:
+        return ListStats(values['count'], False, values['last_modified'])
+    return ListStats(estimate, True, values['last_modified'])
+
+
+def read_stats(queryset):
+    estimate = estimate_count(queryset)
+    return make_stats(
+        queryset.order_by().aggregate(**stats_aggregates(estimate)), estimate
+    )
+
+
+async def aread_stats(queryset):
+    # Estimates need raw cursors and run in a worker thread.
+    estimate = None
+    if connections[queryset.db].vendor == 'postgresql':
+        estimate = await sync_to_async(estimate_count)(queryset)
+    return make_stats(
+        await queryset.order_by().aaggregate(**stats_aggregates(estimate)),
+        estimate
+    )
+
+
+def stats_key(key):
+    return STATS_KEY.format(get_version(RECIPE_COUNTS), key)
+
+
+async def astats_key(key):
+    return STATS_KEY.format(await aget_version(RECIPE_COUNTS), key)
+
+
+def store_stats(cache_key, stats):
+    cache.set(cache_key, stats, settings.RECIPE_COUNT_TIMEOUT)
+    return stats
+
+
+async def astore_stats(cache_key, stats):
+    await cache.aset(cache_key, stats, settings.RECIPE_COUNT_TIMEOUT)
+    return stats
+
+
+def get_list_stats(queryset, key):
+    """Return ListStats of queryset cached under key.
+
+    queryset should be the filtered list without per-user annotations,
+    which the aggregate query would otherwise evaluate for every row.
+    Cached stats live for RECIPE_COUNT_TIMEOUT seconds and are dropped
+    whenever a recipe is saved, deleted or gets new image variants.
+    """
+    cache_key = stats_key(key)
+    return cache.get(cache_key) or store_stats(
+        cache_key, read_stats(queryset)
+    )
+
+
+async def aget_list_stats(queryset, key):
+    """get_list_stats() for async views."""
+    cache_key = await astats_key(key)
+    return await cache.aget(cache_key) or await astore_stats(
+        cache_key, await aread_stats(queryset)
+    )
@@ -1,9 +1,39 @@
+from django import forms
+from django.db.models import Exists, OuterRef
+
 from django_filters.rest_framework import FilterSet, filters
 
-from recipes.models import Recipe, Tag
+from recipes.models import FavoriteRecipe, Recipe, ShoppingCart
+from recipes.registry import tag_registry
+
+TAGS_MATCH_ANY = 'any'
+TAGS_MATCH_ALL = 'all'
+TAGS_MATCH_CHOICES = (
+    (TAGS_MATCH_ANY, 'Any of the tags'),
+    (TAGS_MATCH_ALL, 'All of the tags'),
+)
+
+
+class TagSlugsField(forms.MultipleChoiceField):
+    """Multiple tag slugs validated against the tag registry."""
+
+    def valid_value(self, value):
+        return tag_registry.get_by_slug(value) is not None
+
+
+class TagSlugsFilter(filters.MultipleChoiceFilter):
+    field_class = TagSlugsField
 
 
 class RecipeFilter(FilterSet):
+    """Recipe list filters compiled to single EXISTS subqueries.
+
+    Several tags match recipes having any of them, or all of them with
+    ?tags_match=all. Favorite and cart filters are ignored for anonymous
+    users.
+    """
+    USER_FILTERS = ('is_favorited', 'is_in_shopping_cart')
+
     is_favorited = filters.BooleanFilter(
         method='get_is_favorited'
     )
@@ -11,11 +41,12 @@ class RecipeFilter(FilterSet):
         method='get_is_in_shopping_cart'
     )
 
-    tags = filters.ModelMultipleChoiceFilter(
-        field_name='tags__slug',
-        lookup_expr='iexact',
-        to_field_name='slug',
-        queryset=Tag.objects.all()
+    tags = TagSlugsFilter(
+        method='get_tags'
+    )
+    tags_match = filters.ChoiceFilter(
+        choices=TAGS_MATCH_CHOICES,
+        method='get_tags_match'
     )
 
     class Meta:
@@ -27,25 +58,29 @@ class RecipeFilter(FilterSet):
             'is_in_shopping_cart'
         ]
 
-    def get_is_favorited(self, queryset, name, value):
-        if value:
-            favor_recipes = (
-                self.request.user.favorites.filter(
-                    user=self.request.user
-                )
-            )
-        return queryset.filter(
-            pk__in=(favor.recipe.pk for favor in favor_recipes)
+    def get_tags(self, queryset, name, value):
+        tag_ids = [tag_registry.get_by_slug(slug).pk for slug in value]
+        links = Recipe.tags.through.objects.filter(recipe=OuterRef('pk'))
+        if self.form.cleaned_data.get('tags_match') != TAGS_MATCH_ALL:
+            return queryset.filter(Exists(links.filter(tag_id__in=tag_ids)))
+        for tag_id in tag_ids:
+            queryset = queryset.filter(Exists(links.filter(tag_id=tag_id)))
+        return queryset
+
+    def get_tags_match(self, queryset, name, value):
+        return queryset
+
+    def filter_user_rows(self, queryset, model, value):
+        user = self.request.user
+        if not user.is_authenticated:
+            return queryset
+        rows = Exists(
+            model.objects.filter(user=user, recipe=OuterRef('pk'))
         )
+        return queryset.filter(rows if value else ~rows)
+
+    def get_is_favorited(self, queryset, name, value):
+        return self.filter_user_rows(queryset, FavoriteRecipe, value)
 
     def get_is_in_shopping_cart(self, queryset, name, value):
-        if value:
-            cart_recipes = (
-                self.request.user.shopping_cart.filter(
-                    user=self.request.user
-                )
-            )
-            return queryset.filter(
-                pk__in=(cart.recipe.pk for cart in cart_recipes)
-            )
-        return queryset
+        return self.filter_user_rows(queryset, ShoppingCart, value)
@@ -0,0 +1,147 @@
+"""Thumbnails and WebP variants of uploaded recipe images."""
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.utils import timezone
+
+from PIL import Image, ImageOps
+
+from recipes.models import Recipe
+from recipes.versions import RECIPE_COUNTS, RECIPES, bump_version
+
+VARIANTS = {
+    'list': (320, 214),
+    'card': (600, 400),
+    'detail': (1200, 800),
+}
+FORMATS = {
+    'jpeg': 'JPEG',
+    'webp': 'WEBP',
+}
+QUALITY = 82
+VARIANT_DIR = 'recipe_images/variants'
+
+logger = logging.getLogger(__name__)
+
+
+def render_variants(image_file):
+    """Return {variant: {extension: bytes}} cropped to VARIANTS sizes."""
+    with Image.open(image_file) as image:
+        image = ImageOps.exif_transpose(image).convert('RGB')
+        rendered = {}
+        for variant, size in VARIANTS.items():
+            thumbnail = ImageOps.fit(image, size, Image.Resampling.LANCZOS)
+            rendered[variant] = {}
+            for extension, image_format in FORMATS.items():
+                content = io.BytesIO()
+                thumbnail.save(content, image_format, quality=QUALITY)
+                rendered[variant][extension] = content.getvalue()
+    return rendered
+
+
+def variant_paths(variants):
+    """Stored names of {variant: {extension: name}}."""
+    return {path for files in variants.values() for path in files.values()}
+
+
+def delete_files(paths):
+    storage = Recipe._meta.get_field('image').storage
+    for path in paths:
+        storage.delete(path)
+
+
+def discard_variants(variants, keep=()):
+    """Delete variant files but those in keep once the transaction commits."""
+    paths = variant_paths(variants).difference(keep)
+    if paths:
+        transaction.on_commit(lambda: delete_files(paths))
+
+
+def build_variants(recipe_id, name):
+    """Store variants of image name and attach them to the recipe.
+
+    Variants are dropped if the recipe got another image meanwhile. The
+    files of the variants they replace are deleted after commit.
+    """
+    storage = Recipe._meta.get_field('image').storage
+    with storage.open(name) as image_file:
+        rendered = render_variants(image_file)
+    stem = PurePosixPath(name).stem
+    variants = {
+        variant: {
+            extension: storage.save(
+                f'{VARIANT_DIR}/{stem}_{variant}.{extension}',
+                ContentFile(content)
+            ) for extension, content in files.items()
+        } for variant, files in rendered.items()
+    }
+    with transaction.atomic():
+        previous = Recipe.objects.select_for_update().filter(
+            pk=recipe_id, image=name
+        ).values_list('image_variants', flat=True).first()
+        if previous is None:
+            delete_files(variant_paths(variants))
+            return None
+        Recipe.objects.filter(pk=recipe_id).update(
+            image_variants=variants,
+            updated_at=timezone.now()
+        )
+        discard_variants(previous, keep=variant_paths(variants))
+    # updated_at moved, which cached list stats carry.
+    bump_version(RECIPE_COUNTS)
+    bump_version(RECIPES)
+    return variants
+
+
+class ImageWorkers:
+    """Process wide thread pool started on the first submitted job."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def submit(self, function, *args):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=settings.IMAGE_WORKERS,
+                    thread_name_prefix='recipe-images'
+                )
+        return self._pool.submit(function, *args)
+
+
+image_workers = ImageWorkers()
+
+
+def _build_in_worker(recipe_id, name):
+    try:
+        build_variants(recipe_id, name)
+    except Exception:
+        logger.exception('Could not build variants of %s', name)
+    finally:
+        connections.close_all()
+
+
+def schedule_variants(recipe):
+    """Build variants of the recipe image once the transaction commits.
+
+    Variants are built in a worker pool unless IMAGE_VARIANTS_ASYNC is
+    off, then right in the committing thread.
+    """
+    if not recipe.image:
+        return
+    recipe_id, name = recipe.pk, recipe.image.name
+
+    def submit():
+        if settings.IMAGE_VARIANTS_ASYNC:
+            image_workers.submit(_build_in_worker, recipe_id, name)
+        else:
+            build_variants(recipe_id, name)
+
+    transaction.on_commit(submit)
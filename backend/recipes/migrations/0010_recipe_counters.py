@@ -0,0 +1,86 @@
+# Generated by Django 4.1 on 2026-10-18 03:02
+
+import django.core.validators
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_of(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(total=Count("pk"))
+            .values("total"),
+            output_field=models.PositiveIntegerField(),
+        ),
+        0,
+    )
+
+
+def fill_counters(apps, schema_editor):
+    Recipe = apps.get_model("recipes", "Recipe")
+    FavoriteRecipe = apps.get_model("recipes", "FavoriteRecipe")
+    ShoppingCart = apps.get_model("recipes", "ShoppingCart")
+    User = apps.get_model("users", "User")
+    SubscribeUser = apps.get_model("users", "SubscribeUser")
+    Recipe.objects.update(
+        favorites_count=count_of(FavoriteRecipe, "recipe"),
+        in_carts_count=count_of(ShoppingCart, "recipe"),
+    )
+    User.objects.update(
+        recipes_count=count_of(Recipe, "author"),
+        subscribers_count=count_of(SubscribeUser, "author"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0009_alter_recipe_options"),
+        ("users", "0007_user_recipes_count_user_subscribers_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="favorites_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Favorites count"
+            ),
+        ),
+        migrations.AddField(
+            model_name="recipe",
+            name="in_carts_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="In shopping carts count"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="ingredientrecipe",
+            name="amount",
+            field=models.PositiveIntegerField(
+                validators=[
+                    django.core.validators.MinValueValidator(
+                        1, message="amount is too small"
+                    )
+                ],
+                verbose_name="Ingredient amount",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="recipe",
+            name="cooking_time",
+            field=models.PositiveIntegerField(
+                validators=[
+                    django.core.validators.MinValueValidator(
+                        1, message="cooking_time is too small"
+                    )
+                ],
+                verbose_name="Cooking time in minutes",
+            ),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
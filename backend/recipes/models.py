@@ -1,7 +1,9 @@
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import connections, models
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import RowNumber
 
-from users.models import User
+from users.models import SubscribeUser, User
 
 DEFAULT_COLOR = '#ffffff'
 
@@ -44,6 +46,78 @@ class Tag(AbstractModel):
     )
 
 
+class RecipeQuerySet(models.QuerySet):
+    """Recipe queryset with read path helpers."""
+
+    def with_user_flags(self, user):
+        """Annotate per-user flags as EXISTS subqueries."""
+        if not user.is_authenticated:
+            return self.annotate(
+                is_favorited=models.Value(False),
+                is_in_shopping_cart=models.Value(False),
+                author_is_subscribed=models.Value(False)
+            )
+        return self.annotate(
+            is_favorited=models.Exists(
+                FavoriteRecipe.objects.filter(
+                    user=user,
+                    recipe=models.OuterRef('pk')
+                )
+            ),
+            is_in_shopping_cart=models.Exists(
+                ShoppingCart.objects.filter(
+                    user=user,
+                    recipe=models.OuterRef('pk')
+                )
+            ),
+            author_is_subscribed=models.Exists(
+                SubscribeUser.objects.filter(
+                    user=user,
+                    author=models.OuterRef('author')
+                )
+            )
+        )
+
+    def for_read(self, user):
+        """Queryset for recipe serialization with constant query count."""
+        return self.with_user_flags(user).select_related(
+            'author'
+        ).prefetch_related(
+            models.Prefetch(
+                'tags', queryset=Tag.objects.only('id').order_by('id')
+            ),
+            models.Prefetch(
+                'ingredient_recipe',
+                queryset=IngredientRecipe.objects.select_related(
+                    'ingredient'
+                ).order_by('id')
+            )
+        )
+
+    def top_per_author(self, author_ids, limit):
+        """Newest limit recipes of each author, ranked by ROW_NUMBER().
+
+        Django 4.1 cannot filter on a window annotation, so the ranked
+        query becomes a subquery filtered on its position column.
+        """
+        ranked = self.model.objects.filter(
+            author_id__in=author_ids
+        ).annotate(
+            position=models.Window(
+                RowNumber(),
+                partition_by=models.F('author_id'),
+                order_by=models.F('id').desc()
+            )
+        ).order_by().values('pk', 'position')
+        sql, params = ranked.query.sql_with_params()
+        quote = connections[self.db].ops.quote_name
+        return self.filter(pk__in=RawSQL(
+            f'SELECT {quote("id")} FROM ({sql}) ranked '
+            f'WHERE {quote("position")} <= %s',
+            (*params, limit)
+        ))
+
+
 class Recipe(AbstractModel):
     """Recepie class"""
     author = models.ForeignKey(
@@ -57,6 +131,13 @@ class Recipe(AbstractModel):
         editable=True
     )
 
+    image_variants = models.JSONField(
+        'Image variants',
+        default=dict,
+        blank=True,
+        editable=False
+    )
+
     text = models.TextField('Description')
 
     tags = models.ManyToManyField(Tag)
@@ -73,12 +154,33 @@ class Recipe(AbstractModel):
         through='IngredientRecipe'
     )
 
+    created_at = models.DateTimeField(
+        'Created at',
+        auto_now_add=True
+    )
+
+    updated_at = models.DateTimeField(
+        'Updated at',
+        auto_now=True
+    )
+
+    favorites_count = models.PositiveIntegerField(
+        'Favorites count',
+        default=0,
+        editable=False
+    )
+
+    in_carts_count = models.PositiveIntegerField(
+        'In shopping carts count',
+        default=0,
+        editable=False
+    )
+
+    objects = RecipeQuerySet.as_manager()
+
     class Meta:
         ordering = ('-id', )
 
-    def _favorites_count(self):
-        return self.favorites.count()
-
     def __str__(self):
         return f'Recipe: {self.name}'
 
@@ -160,3 +262,53 @@ class ShoppingCart(models.Model):
                 name='user_shopping_cart_constraint'
             )
         ]
+
+
+class ShoppingListItem(models.Model):
+    """Total ingredient amount over all recipes in user's shopping cart."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='shopping_list'
+    )
+
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        related_name='shopping_list_items'
+    )
+
+    total_amount = models.PositiveIntegerField('Total amount')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'ingredient'],
+                name='shopping_list_item_constraint'
+            )
+        ]
+
+
+class TimelineEntry(models.Model):
+    """Recipe of a followed author copied into the follower's feed."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline'
+    )
+
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'recipe'],
+                name='timeline_entry_constraint'
+            )
+        ]
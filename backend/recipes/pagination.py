@@ -1,6 +1,150 @@
-from rest_framework.pagination import PageNumberPagination
+from functools import partial
+
+from django.core.paginator import EmptyPage, InvalidPage, Page, Paginator
+from django.utils.functional import cached_property
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+PAGE_SIZE = 16
+MAX_PAGE_SIZE = 100
+
+
+class ProbedPage(Page):
+    """Page read one row past its end, which tells whether more follow.
+
+    object_list is that longer slice until the rows are read, then the
+    page rows alone.
+    """
+
+    more = None
+
+    def set_rows(self, rows):
+        per_page = self.paginator.per_page
+        self.object_list, self.more = rows[:per_page], len(rows) > per_page
+
+    def read(self):
+        if self.more is None:
+            self.set_rows(list(self.object_list))
+
+    def __len__(self):
+        self.read()
+        return super().__len__()
+
+    def __getitem__(self, index):
+        self.read()
+        return super().__getitem__(index)
+
+    def has_next(self):
+        self.read()
+        return self.more
+
+
+class CountedPaginator(Paginator):
+    """Paginator taking its total from a count provider.
+
+    An approximate total may undercount, so its pages are sliced without
+    a cut at the total and pages past the estimated last page are still
+    served instead of raising 404.
+    """
+
+    def __init__(self, object_list, per_page, count_provider=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_provider = count_provider
+        self.approximate = False
+
+    @cached_property
+    def count(self):
+        if self.count_provider is None:
+            return super().count
+        count, self.approximate = self.count_provider(self.object_list)
+        return count
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not self.approximate or int(number) < 1:
+                raise
+            return int(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.approximate:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        return ProbedPage(
+            self.object_list[bottom:bottom + self.per_page + 1], number, self
+        )
+
+
+class KeysetPagination(CursorPagination):
+    """Seek on id with opaque cursors, no COUNT query."""
+    page_size_query_param = 'limit'
+    page_size = PAGE_SIZE
+    max_page_size = MAX_PAGE_SIZE
+    ordering = '-id'
 
 
 class LimitedPagination(PageNumberPagination):
+    """Page number pagination, keyset pagination when ?cursor= is given.
+
+    An empty ?cursor= starts a keyset walk, next and previous links
+    carry the encoded cursors. Views may define get_count(queryset)
+    returning (count, approximate) to replace the COUNT query; an
+    approximate count is flagged with count_approximate in the response.
+    """
     page_size_query_param = 'limit'
-    page_size = 16
+    page_size = PAGE_SIZE
+    max_page_size = MAX_PAGE_SIZE
+    cursor_query_param = KeysetPagination.cursor_query_param
+
+    def __init__(self):
+        self.keyset = None
+
+    def is_keyset(self, request):
+        return self.cursor_query_param in request.query_params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.is_keyset(request):
+            self.keyset = KeysetPagination()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        self.django_paginator_class = partial(
+            CountedPaginator,
+            count_provider=getattr(view, 'get_count', None)
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, total):
+        """Page number pagination for async views.
+
+        total is the (count, approximate) pair awaited beforehand, so
+        only the page rows are read here.
+        """
+        paginator = CountedPaginator(
+            queryset,
+            self.get_page_size(request),
+            count_provider=lambda queryset: total
+        )
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            ))
+        rows = [row async for row in self.page.object_list]
+        if isinstance(self.page, ProbedPage):
+            self.page.set_rows(rows)
+        else:
+            self.page.object_list = rows
+        self.request = request
+        return self.page.object_list
+
+    def get_paginated_response(self, data):
+        if self.keyset:
+            return self.keyset.get_paginated_response(data)
+        response = super().get_paginated_response(data)
+        if self.page.paginator.approximate:
+            response.data['count_approximate'] = True
+        return response
@@ -0,0 +1,50 @@
+"""Process-local registry of tags."""
+from django.db import DEFAULT_DB_ALIAS
+
+from recipes.models import Tag
+from recipes.versions import TAGS, VersionedData
+
+TAG_FIELDS = ('id', 'name', 'color', 'slug')
+
+
+class TagRegistry(VersionedData):
+    """Tags keyed by id and casefolded slug.
+
+    Rebuilt when the tag catalog version changes, which Tag save and
+    delete signals bump.
+    """
+
+    catalog = TAGS
+
+    def build(self):
+        rows = list(Tag.objects.order_by('id').values(*TAG_FIELDS))
+        by_id = {row['id']: row for row in rows}
+        by_slug = {
+            row['slug'].casefold(): row for row in rows if row['slug']
+        }
+        return by_id, by_slug
+
+    @staticmethod
+    def _instance(row):
+        if row is None:
+            return None
+        return Tag.from_db(
+            DEFAULT_DB_ALIAS, TAG_FIELDS, [row[name] for name in TAG_FIELDS]
+        )
+
+    def get_data_by_id(self, pk):
+        """Return serialized tag dict or None."""
+        by_id, _ = self.get_data()
+        return by_id.get(pk)
+
+    def get(self, pk):
+        """Return Tag instance by id or None."""
+        return self._instance(self.get_data_by_id(pk))
+
+    def get_by_slug(self, slug):
+        """Return Tag instance by case-insensitive slug or None."""
+        _, by_slug = self.get_data()
+        return self._instance(by_slug.get(slug.casefold()))
+
+
+tag_registry = TagRegistry()
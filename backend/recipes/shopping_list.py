@@ -0,0 +1,151 @@
+"""Incremental maintenance of the materialized shopping list."""
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Sum, Value, When
+
+from recipes.models import IngredientRecipe, ShoppingCart, ShoppingListItem
+
+BATCH_SIZE = 1000
+
+
+def recipe_amounts(recipe_id):
+    """Return {ingredient_id: amount} of a recipe."""
+    return dict(
+        IngredientRecipe.objects.filter(
+            recipe_id=recipe_id
+        ).values_list('ingredient_id', 'amount')
+    )
+
+
+def cart_user_ids(recipe_id):
+    """Return ids of users having the recipe in their cart."""
+    return list(
+        ShoppingCart.objects.filter(
+            recipe_id=recipe_id
+        ).values_list('user_id', flat=True)
+    )
+
+
+def amounts_delta(old, new):
+    """Return per ingredient change from old to new amounts."""
+    return {
+        ingredient_id: new.get(ingredient_id, 0) - old.get(ingredient_id, 0)
+        for ingredient_id in old.keys() | new.keys()
+        if new.get(ingredient_id, 0) != old.get(ingredient_id, 0)
+    }
+
+
+def amount_by_ingredient(amounts):
+    """Per row amount taken from {ingredient_id: amount}."""
+    return Case(
+        *(
+            When(ingredient_id=ingredient_id, then=Value(amount))
+            for ingredient_id, amount in amounts.items()
+        ),
+        default=Value(0),
+        output_field=IntegerField()
+    )
+
+
+@transaction.atomic
+def apply_delta(user_ids, delta):
+    """Add {ingredient_id: amount} delta to shopping lists of users.
+
+    Totals change in single UPDATE statements, so concurrent cart writes
+    of a user add up. Missing rows are inserted empty first, ignoring
+    rows a concurrent writer has just inserted.
+    """
+    if not user_ids or not delta:
+        return
+    added = {pk: amount for pk, amount in delta.items() if amount > 0}
+    taken = {pk: -amount for pk, amount in delta.items() if amount < 0}
+    if added:
+        ShoppingListItem.objects.bulk_create(
+            (
+                ShoppingListItem(
+                    user_id=user_id,
+                    ingredient_id=ingredient_id,
+                    total_amount=0
+                ) for user_id in user_ids for ingredient_id in added
+            ),
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True
+        )
+        ShoppingListItem.objects.filter(
+            user_id__in=user_ids, ingredient_id__in=added
+        ).update(total_amount=F('total_amount') + amount_by_ingredient(added))
+    if taken:
+        items = ShoppingListItem.objects.filter(
+            user_id__in=user_ids, ingredient_id__in=taken
+        )
+        items.filter(total_amount__lte=amount_by_ingredient(taken)).delete()
+        items.filter(total_amount__gt=amount_by_ingredient(taken)).update(
+            total_amount=F('total_amount') - amount_by_ingredient(taken)
+        )
+
+
+def add_recipe(user_ids, recipe_id):
+    """Recipe was put into carts of users."""
+    apply_delta(user_ids, recipe_amounts(recipe_id))
+
+
+def remove_recipe(user_ids, recipe_id):
+    """Recipe was taken out of carts of users."""
+    apply_delta(
+        user_ids,
+        {
+            ingredient_id: -amount
+            for ingredient_id, amount in recipe_amounts(recipe_id).items()
+        }
+    )
+
+
+def source_totals(user_ids=None):
+    """Aggregate {(user_id, ingredient_id): total} from cart recipes."""
+    if user_ids is None:
+        carts = {'recipe__in_shopping_cart__isnull': False}
+    else:
+        carts = {'recipe__in_shopping_cart__user__in': user_ids}
+    rows = IngredientRecipe.objects.filter(
+        **carts
+    ).values_list(
+        'recipe__in_shopping_cart__user',
+        'ingredient'
+    ).annotate(total=Sum('amount')).order_by()
+    return {
+        (user_id, ingredient_id): total
+        for user_id, ingredient_id, total in rows.iterator()
+    }
+
+
+def stored_totals(user_ids=None):
+    """Read {(user_id, ingredient_id): total} from the shopping list."""
+    items = ShoppingListItem.objects.all()
+    if user_ids is not None:
+        items = items.filter(user_id__in=user_ids)
+    return {
+        (user_id, ingredient_id): total
+        for user_id, ingredient_id, total in items.values_list(
+            'user_id', 'ingredient_id', 'total_amount'
+        ).iterator()
+    }
+
+
+@transaction.atomic
+def rebuild(user_ids=None):
+    """Recreate shopping list rows from carts, return rows written."""
+    totals = source_totals(user_ids)
+    items = ShoppingListItem.objects.all()
+    if user_ids is not None:
+        items = items.filter(user_id__in=user_ids)
+    items.delete()
+    ShoppingListItem.objects.bulk_create(
+        (
+            ShoppingListItem(
+                user_id=user_id,
+                ingredient_id=ingredient_id,
+                total_amount=total
+            ) for (user_id, ingredient_id), total in totals.items()
+        ),
+        batch_size=BATCH_SIZE
+    )
+    return len(totals)
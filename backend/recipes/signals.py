@@ -0,0 +1,144 @@
+"""Keep denormalized counters, shopping lists, timelines and catalogs in sync."""
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from recipes import shopping_list, timeline
+from recipes.images import discard_variants
+from recipes.models import FavoriteRecipe, Ingredient, Recipe, ShoppingCart, Tag
+from recipes.versions import (
+    AUTHORS,
+    INGREDIENTS,
+    RECIPE_COUNTS,
+    RECIPES,
+    TAGS,
+    bump_version
+)
+from users.models import SubscribeUser, User
+
+# User fields embedded in recipe representations.
+PROFILE_FIELDS = frozenset(('email', 'username', 'first_name', 'last_name'))
+
+
+def shift_counter(model, pk, field, delta):
+    """Atomically add delta to a counter column, never below zero."""
+    queryset = model.objects.filter(pk=pk)
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    queryset.update(**{field: F(field) + delta})
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_created(sender, instance, created, **kwargs):
+    bump_version(RECIPE_COUNTS)
+    bump_version(RECIPES)
+    if created:
+        shift_counter(User, instance.author_id, 'recipes_count', 1)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, origin=None, **kwargs):
+    bump_version(RECIPE_COUNTS)
+    bump_version(RECIPES)
+    if not isinstance(origin, User):
+        shift_counter(User, instance.author_id, 'recipes_count', -1)
+    discard_variants(instance.image_variants)
+
+
+@receiver(post_save, sender=FavoriteRecipe)
+def favorite_created(sender, instance, created, **kwargs):
+    bump_version(RECIPES)
+    if created:
+        shift_counter(Recipe, instance.recipe_id, 'favorites_count', 1)
+
+
+@receiver(post_delete, sender=FavoriteRecipe)
+def favorite_deleted(sender, instance, origin=None, **kwargs):
+    bump_version(RECIPES)
+    if not isinstance(origin, Recipe):
+        shift_counter(Recipe, instance.recipe_id, 'favorites_count', -1)
+
+
+@receiver(post_save, sender=ShoppingCart)
+def cart_item_created(sender, instance, created, **kwargs):
+    if created:
+        shift_counter(Recipe, instance.recipe_id, 'in_carts_count', 1)
+
+
+@receiver(post_delete, sender=ShoppingCart)
+def cart_item_deleted(sender, instance, origin=None, **kwargs):
+    if not isinstance(origin, Recipe):
+        shift_counter(Recipe, instance.recipe_id, 'in_carts_count', -1)
+
+
+@receiver(post_save, sender=SubscribeUser)
+def subscription_created(sender, instance, created, **kwargs):
+    if created:
+        shift_counter(User, instance.author_id, 'subscribers_count', 1)
+
+
+@receiver(post_delete, sender=SubscribeUser)
+def subscription_deleted(sender, instance, origin=None, **kwargs):
+    if not isinstance(origin, User) or origin.pk != instance.author_id:
+        shift_counter(User, instance.author_id, 'subscribers_count', -1)
+
+
+@receiver(pre_delete, sender=Recipe)
+def recipe_leaves_carts(sender, instance, **kwargs):
+    shopping_list.remove_recipe(
+        shopping_list.cart_user_ids(instance.pk), instance.pk
+    )
+
+
+@receiver(post_save, sender=ShoppingCart)
+def recipe_added_to_cart(sender, instance, created, **kwargs):
+    if created:
+        shopping_list.add_recipe([instance.user_id], instance.recipe_id)
+
+
+@receiver(post_delete, sender=ShoppingCart)
+def recipe_removed_from_cart(sender, instance, origin=None, **kwargs):
+    # Recipe deletion is handled in pre_delete while its ingredients
+    # still exist; a deleted user's shopping list goes away by cascade.
+    if not isinstance(origin, (Recipe, User)):
+        shopping_list.remove_recipe([instance.user_id], instance.recipe_id)
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def ingredient_changed(sender, **kwargs):
+    bump_version(INGREDIENTS)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def tag_changed(sender, **kwargs):
+    bump_version(TAGS)
+
+
+@receiver(post_save, sender=User)
+def profile_changed(sender, instance, created, update_fields=None, **kwargs):
+    # Logins save last_login alone, which recipes do not show.
+    if created:
+        return
+    if update_fields is None or PROFILE_FIELDS & update_fields:
+        bump_version(AUTHORS)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_published(sender, instance, created, **kwargs):
+    if created:
+        timeline.fan_out(instance)
+
+
+@receiver(post_save, sender=SubscribeUser)
+def author_followed(sender, instance, created, **kwargs):
+    if created:
+        timeline.backfill(instance.user_id, instance.author)
+
+
+@receiver(post_delete, sender=SubscribeUser)
+def author_unfollowed(sender, instance, origin=None, **kwargs):
+    # Timeline rows of a deleted user or author go away by cascade.
+    if not isinstance(origin, User):
+        timeline.trim(instance.user_id, instance.author_id)
@@ -0,0 +1,108 @@
+"""Subscription feed timelines filled on write.
+
+A new recipe is copied into timelines of its author's subscribers.
+Authors followed by more than FEED_FANOUT_MAX_SUBSCRIBERS users are not
+fanned out, their recipes are merged into feeds at read time instead.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from recipes.models import Recipe, TimelineEntry
+from users.models import SubscribeUser
+
+BATCH_SIZE = 1000
+
+
+def is_fanned_out(author):
+    """Whether recipes of author are copied into timelines."""
+    return author.subscribers_count <= settings.FEED_FANOUT_MAX_SUBSCRIBERS
+
+
+def feed_recipes(user, queryset):
+    """Filter queryset to recipes from authors followed by user."""
+    merged_authors = SubscribeUser.objects.filter(
+        user=user,
+        author__subscribers_count__gt=settings.FEED_FANOUT_MAX_SUBSCRIBERS
+    ).values('author_id')
+    return queryset.filter(
+        Q(pk__in=TimelineEntry.objects.filter(user=user).values('recipe_id'))
+        | Q(author_id__in=merged_authors)
+    )
+
+
+def fan_out(recipe):
+    """Copy a new recipe into timelines of its author's subscribers."""
+    if not is_fanned_out(recipe.author):
+        return
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user_id=user_id, recipe=recipe)
+            for user_id in SubscribeUser.objects.filter(
+                author_id=recipe.author_id
+            ).values_list('user_id', flat=True).iterator()
+        ),
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True
+    )
+
+
+def backfill(user_id, author):
+    """Copy latest recipes of a newly followed author into a timeline."""
+    if not is_fanned_out(author):
+        return
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user_id=user_id, recipe_id=recipe_id)
+            for recipe_id in Recipe.objects.filter(
+                author=author
+            ).order_by('-id').values_list(
+                'id', flat=True
+            )[:settings.FEED_BACKFILL_SIZE]
+        ),
+        ignore_conflicts=True
+    )
+
+
+def trim(user_id, author_id):
+    """Drop recipes of an unfollowed author from a timeline."""
+    TimelineEntry.objects.filter(
+        user_id=user_id, recipe__author_id=author_id
+    ).delete()
+
+
+@transaction.atomic
+def rebuild(user_ids=None):
+    """Recreate timelines from subscriptions, return rows written.
+
+    Fixes gaps left by authors crossing FEED_FANOUT_MAX_SUBSCRIBERS and
+    by recipes inserted without signals.
+    """
+    subscriptions = SubscribeUser.objects.filter(
+        author__subscribers_count__lte=settings.FEED_FANOUT_MAX_SUBSCRIBERS
+    )
+    entries = TimelineEntry.objects.all()
+    if user_ids is not None:
+        subscriptions = subscriptions.filter(user_id__in=user_ids)
+        entries = entries.filter(user_id__in=user_ids)
+    followers = defaultdict(list)
+    for user_id, author_id in subscriptions.values_list(
+        'user_id', 'author_id'
+    ).iterator():
+        followers[author_id].append(user_id)
+    entries.delete()
+    if not followers:
+        return 0
+    recipes = Recipe.objects.top_per_author(
+        list(followers), settings.FEED_BACKFILL_SIZE
+    ).values_list('id', 'author_id')
+    return len(TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user_id=user_id, recipe_id=recipe_id)
+            for recipe_id, author_id in recipes.iterator()
+            for user_id in followers[author_id]
+        ),
+        batch_size=BATCH_SIZE
+    ))
@@ -0,0 +1,111 @@
+"""Data versions of rarely changing catalogs."""
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from asgiref.sync import sync_to_async
+
+VERSION_KEY = 'catalog-version:{}'
+
+INGREDIENTS = 'ingredients'
+TAGS = 'tags'
+RECIPE_COUNTS = 'recipe-counts'
+RECIPES = 'recipes'
+AUTHORS = 'authors'
+
+
+def version_keys(names):
+    return {VERSION_KEY.format(name): name for name in names}
+
+
+def get_versions(*names):
+    """Return {name: version} of catalogs read in one cache call.
+
+    A missing version starts from the current time, so a cleared cache
+    never brings an old version number back.
+    """
+    keys = version_keys(names)
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    for key in missing:
+        cache.add(key, time.time_ns(), None)
+    if missing:
+        found.update(cache.get_many(missing))
+    return {name: found[key] for key, name in keys.items()}
+
+
+async def aget_versions(*names):
+    """get_versions() for async views."""
+    keys = version_keys(names)
+    found = await cache.aget_many(keys)
+    missing = [key for key in keys if key not in found]
+    for key in missing:
+        await cache.aadd(key, time.time_ns(), None)
+    if missing:
+        found.update(await cache.aget_many(missing))
+    return {name: found[key] for key, name in keys.items()}
+
+
+def get_version(name):
+    """Return current version of a catalog."""
+    return get_versions(name)[name]
+
+
+async def aget_version(name):
+    """get_version() for async views."""
+    return (await aget_versions(name))[name]
+
+
+def _incr_version(name):
+    key = VERSION_KEY.format(name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def bump_version(name):
+    """Mark a catalog as changed.
+
+    The version is bumped right away for readers inside the current
+    transaction and once more after commit, so no process keeps data it
+    loaded before the change became visible.
+    """
+    _incr_version(name)
+    transaction.on_commit(lambda: _incr_version(name))
+
+
+class VersionedData:
+    """Process-local data rebuilt whenever its catalog version changes."""
+
+    catalog = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._data = None
+
+    def build(self):
+        raise NotImplementedError
+
+    def invalidate(self):
+        self._version = None
+
+    def get_data(self):
+        version = get_version(self.catalog)
+        if self._version == version:
+            return self._data
+        with self._lock:
+            if self._version != version:
+                self._data = self.build()
+                self._version = version
+            return self._data
+
+    async def aget_data(self):
+        """get_data() for async views, building in a worker thread."""
+        version = await aget_version(self.catalog)
+        if self._version == version:
+            return self._data
+        return await sync_to_async(self.get_data)()
@@ -5,7 +5,15 @@ from .models import SubscribeUser, User
 
 class UserAdmin(admin.ModelAdmin):
 
-    list_display = ('id', 'first_name', 'last_name', 'username', 'email')
+    list_display = (
+        'id',
+        'first_name',
+        'last_name',
+        'username',
+        'email',
+        'recipes_count',
+        'subscribers_count'
+    )
     search_fields = ('username', 'email')
     list_filter = ('username', 'email')
     empty_value_display = '-empty-'
@@ -17,6 +17,16 @@ class User(AbstractUser):
         verbose_name='Last Name',
         max_length=150,
     )
+    recipes_count = models.PositiveIntegerField(
+        verbose_name='Recipes count',
+        default=0,
+        editable=False
+    )
+    subscribers_count = models.PositiveIntegerField(
+        verbose_name='Subscribers count',
+        default=0,
+        editable=False
+    )
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
 